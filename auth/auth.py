@@ -1,13 +1,16 @@
 # from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials, OAuth2PasswordBearer
-import bcrypt
 import jwt
-from signup_login.core.db import user_collection
+from signup_login.core.repository import user_repository
 from jwt.exceptions import InvalidTokenError, PyJWTError as JWTError
 from datetime import datetime, timedelta, timezone
 from signup_login.models.user import UserInDB
+from signup_login.auth.hashing import password_hasher
+from signup_login.auth.cache import TTLCache
+from signup_login.core.broker import QueueConsumer, MessageHandler, AUTH_INVALIDATE_EXCHANGE
 from fastapi import Depends, HTTPException, status
 from typing import Annotated
+import json
 import os
 from dotenv import load_dotenv
 load_dotenv()
@@ -15,28 +18,34 @@ load_dotenv()
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES")
+AUTH_CACHE_TTL_SECONDS = float(os.getenv("AUTH_CACHE_TTL_SECONDS", "60"))
+AUTH_CACHE_MAX_ENTRIES = int(os.getenv("AUTH_CACHE_MAX_ENTRIES", "10000"))
+
+# token -> email, so a repeated bearer token skips jwt.decode
+token_cache = TTLCache(AUTH_CACHE_MAX_ENTRIES, AUTH_CACHE_TTL_SECONDS)
+# email -> user document, so an authenticated request skips the Mongo lookup
+user_cache = TTLCache(AUTH_CACHE_MAX_ENTRIES, AUTH_CACHE_TTL_SECONDS)
 
 # oauth2_scheme = HTTPBearer()
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-def verify_password(plain_password, hashed_password):
-    return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
+async def verify_password_async(plain_password, hashed_password):
+    return await password_hasher.verify(plain_password, hashed_password)
 
-def password_hash(password: str):
-    hashed_pw = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
-    return hashed_pw
+async def password_hash_async(password: str):
+    return await password_hasher.hash(password)
 
-def get_user(email: str):
-    user = user_collection.find_one({"email" : email})
+async def get_user(email: str):
+    user = await user_repository.get_by_email(email)
     if not user :
         return False
     return UserInDB(**user)
 
-def authenticate_user(email: str, password: str):
-    user = user_collection.find_one({"email" : email})
+async def authenticate_user(email: str, password: str):
+    user = await user_repository.get_by_email(email)
     if not user :
         return False
-    if not verify_password(password, user["password"]):
+    if not await verify_password_async(password, user["password"]):
         return False
     return user
 
@@ -51,6 +60,51 @@ def create_access_token(email: str, expires_delta: timedelta | None = None):
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def _drop_cached(email: str | None):
+    if email is None:
+        user_cache.clear()
+        token_cache.clear()
+    else:
+        user_cache.invalidate(email)
+
+def _apply_invalidation(message: str):
+    _drop_cached(json.loads(message).get("email"))
+
+# Every worker consumes the invalidations any worker broadcasts; started in the app lifespan
+auth_invalidation_consumer = QueueConsumer(MessageHandler(_apply_invalidation), AUTH_INVALIDATE_EXCHANGE)
+
+async def invalidate_user_cache(email: str | None = None):
+    """Drop cached users after a write, in this worker and (over RabbitMQ) in every other one.
+
+    With no email, drop everything. While RabbitMQ is unreachable only this
+    worker's caches are dropped; the others may keep serving the old user
+    for up to AUTH_CACHE_TTL_SECONDS.
+    """
+    _drop_cached(email)
+    await auth_invalidation_consumer.broadcast(json.dumps({"email": email}))
+
+def auth_cache_stats() -> dict:
+    return {"tokens": token_cache.stats(), "users": user_cache.stats()}
+
+def token_subject(token: str) -> str | None:
+    """Email the bearer token was issued to, or None if the token isn't valid.
+
+    Raises nothing; invalid and expired tokens are just None.
+    """
+    email = token_cache.get(token)
+    if email is None:
+        try:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        except JWTError as e:
+            print(f"JWT Error: {e}")
+            return None
+        email = payload.get("sub")
+        if not email:
+            return None
+        # Never cache a token past its own expiry
+        token_cache.set(token, email, ttl=payload.get("exp", 0) - datetime.now(timezone.utc).timestamp())
+    return email
+
 async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]) -> dict:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -58,17 +112,18 @@ async def get_current_user(token: Annotated[str, Depends(oauth2_scheme)]) -> dic
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
+        email = token_subject(token)
         if not email:
             raise credentials_exception
-        user_data = user_collection.find_one({"email": email}, {"_id": 0})
-        if not user_data:
-            raise credentials_exception
-        return user_data
-    except JWTError as e:
-        print(f"JWT Error: {e}")
-        raise credentials_exception
+
+        user_data = user_cache.get(email)
+        if user_data is None:
+            user_data = await user_repository.get_by_email(email, {"_id": 0})
+            if not user_data:
+                raise credentials_exception
+            user_cache.set(email, user_data)
+        # Handlers may mutate the result (e.g. pop the password), so hand out a copy
+        return dict(user_data)
     except Exception as e:
         print(f"Other error: {e}")
         raise credentials_exception
@@ -0,0 +1,83 @@
+"""Conformance checks and client-overhead timings for every provider adapter.
+
+Each provider client is driven through the shared engine against the fake
+provider with a stub MCP session. The checks cover plain turns, streaming
+event order and multi-turn history; timings report how much time the client
+adds on top of the provider's own latency.
+
+    python -m signup_login.benchmarks.bench_adapters --latency 0.05 --turns 20
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+from signup_login.benchmarks.fake_provider import (
+    FakeProvider, start_fake_provider, use_fake_provider, attach_stub_session, REPLY,
+)
+
+PORT = 8903
+
+
+async def _check_plain_turn(client) -> str | None:
+    text, messages = await client.process_query("hello")
+    if text != REPLY:
+        return f"unexpected reply {text!r}"
+    if [m["role"] for m in messages] != ["user", "assistant"]:
+        return f"unexpected history roles {[m['role'] for m in messages]}"
+
+
+async def _check_stream_order(client) -> str | None:
+    events = [event async for event in client.process_query_stream("hello")]
+    if events[-1]["type"] != "done":
+        return "stream did not end with a done event"
+    streamed = "".join(event["text"] for event in events if event["type"] == "text")
+    if streamed != events[-1]["text"]:
+        return f"deltas {streamed!r} do not add up to the final text {events[-1]['text']!r}"
+
+
+async def _check_history(client) -> str | None:
+    _, messages = await client.process_query("first")
+    text, messages = await client.process_query("second", messages)
+    if text != REPLY or [m["role"] for m in messages] != ["user", "assistant", "user", "assistant"]:
+        return "multi-turn history was not carried over"
+
+
+CHECKS = [("plain turn", _check_plain_turn), ("stream order", _check_stream_order), ("history", _check_history)]
+
+
+async def main(latency: float, turns: int) -> int:
+    use_fake_provider(PORT)
+    import client_anthropic
+    import client_gemini
+    import client_openai
+
+    failures = 0
+    runner = await start_fake_provider(FakeProvider(latency), port=PORT)
+    try:
+        for name, module in (("anthropic", client_anthropic), ("openai", client_openai), ("gemini", client_gemini)):
+            client = attach_stub_session(module.MCPClient())
+            for check_name, check in CHECKS:
+                error = await check(client)
+                failures += error is not None
+                print(f"{name:<10} {check_name:<14} {'FAIL: ' + error if error else 'ok'}")
+
+            timings = []
+            for _ in range(turns):
+                start = time.perf_counter()
+                await client.process_query("hello")
+                timings.append(time.perf_counter() - start)
+            overhead = (statistics.median(timings) - latency) * 1000
+            print(f"{name:<10} {'overhead':<14} {overhead:.1f}ms per turn (median of {turns})")
+    finally:
+        await runner.cleanup()
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--turns", type=int, default=20)
+    args = parser.parse_args()
+    sys.exit(1 if asyncio.run(main(args.latency, args.turns)) else 0)
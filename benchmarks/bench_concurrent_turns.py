@@ -0,0 +1,42 @@
+"""Concurrent process_query turns for each client against the fake provider.
+
+With async provider calls, N concurrent turns finish in roughly one provider
+latency instead of N of them.
+
+    python -m signup_login.benchmarks.bench_concurrent_turns --conversations 50 --latency 0.2
+"""
+import argparse
+import asyncio
+import time
+
+from signup_login.benchmarks.fake_provider import FakeProvider, start_fake_provider, use_fake_provider, attach_stub_session
+
+PORT = 8901
+
+
+async def main(conversations: int, latency: float):
+    use_fake_provider(PORT)
+    import client_anthropic
+    import client_gemini
+    import client_openai
+
+    provider = FakeProvider(latency)
+    runner = await start_fake_provider(provider, port=PORT)
+    try:
+        for name, module in (("anthropic", client_anthropic), ("openai", client_openai), ("gemini", client_gemini)):
+            client = attach_stub_session(module.MCPClient())
+            start = time.perf_counter()
+            await asyncio.gather(*(client.process_query(f"hello {i}") for i in range(conversations)))
+            elapsed = time.perf_counter() - start
+            print(f"{name:<10} {conversations} concurrent turns in {elapsed:.2f}s "
+                  f"(sequential would be >= {conversations * latency:.2f}s)")
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--conversations", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.2)
+    args = parser.parse_args()
+    asyncio.run(main(args.conversations, args.latency))
@@ -0,0 +1,63 @@
+"""Request size and latency of the Gemini client over a long conversation.
+
+Compares a stateless request per turn (full history converted and sent each
+time) with a persistent chat session, with and without the tool declarations
+in a context cache. The Gemini API itself is stateless, so a chat session
+still sends the history; what it saves is the per-turn conversion, and the
+cache saves resending the tool declarations.
+
+    python -m signup_login.benchmarks.bench_gemini_session --turns 50 --latency 0.02
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from signup_login.benchmarks.fake_provider import (FakeProvider, StubMCPSession, attach_stub_session, server_tools,
+                                                   start_fake_provider, use_fake_provider)
+
+PORT = 8904
+
+
+async def _conversation(client, provider: FakeProvider, turns: int) -> dict:
+    provider.request_bytes.clear()
+    timings = []
+    messages = []
+    for turn in range(turns):
+        start = time.perf_counter()
+        _, messages = await client.process_query(f"Question number {turn}?", messages)
+        timings.append(time.perf_counter() - start)
+    return {"bytes": list(provider.request_bytes), "timings": timings}
+
+
+async def main(turns: int, latency: float):
+    use_fake_provider(PORT)
+    import client_gemini
+    from adapter_gemini import GeminiAdapter
+
+    provider = FakeProvider(latency)
+    runner = await start_fake_provider(provider, port=PORT)
+    try:
+        modes = (("stateless", False, False), ("chat session", True, False), ("session + cache", True, True))
+        for name, chat_session, context_cache in modes:
+            client = attach_stub_session(client_gemini.MCPClient(), StubMCPSession(server_tools()))
+            client.adapter = GeminiAdapter(chat_session=chat_session, context_cache=context_cache)
+            result = await _conversation(client, provider, turns)
+            sizes = result["bytes"]
+            overhead = (statistics.median(result["timings"]) - latency) * 1000
+            last = result["timings"][-10:]
+            rebuilds = client.adapter.chat_rebuilds() if client.adapter.chat_sessions is not None else turns
+            print(f"{name:<16} total {sum(sizes) / 1024:.1f}KB, first turn {sizes[0]}B, last turn {sizes[-1]}B | "
+                  f"overhead {overhead:.2f}ms median, last 10 turns {(statistics.median(last) - latency) * 1000:.2f}ms | "
+                  f"history rebuilds {rebuilds}")
+            await client.adapter.aclose()
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.02)
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, args.latency))
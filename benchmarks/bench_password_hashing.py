@@ -0,0 +1,61 @@
+"""Concurrent login throughput: inline bcrypt vs. the PasswordHasher pool.
+
+Run from the directory containing the `signup_login` package:
+
+    python -m signup_login.benchmarks.bench_password_hashing --logins 64
+"""
+import argparse
+import asyncio
+import time
+
+import bcrypt
+
+from signup_login.auth.hashing import PasswordHasher, BCRYPT_ROUNDS
+
+
+async def _loop_lag(stop: asyncio.Event, samples: list):
+    # Measures how late a 10ms timer fires, i.e. how long the loop was blocked.
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        samples.append(time.perf_counter() - start - 0.01)
+
+
+async def _run(label: str, login, logins: int):
+    stop = asyncio.Event()
+    lag = []
+    lag_task = asyncio.create_task(_loop_lag(stop, lag))
+    start = time.perf_counter()
+    results = await asyncio.gather(*(login() for _ in range(logins)), return_exceptions=True)
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await lag_task
+    ok = sum(1 for r in results if r is True)
+    print(f"{label:<10} {logins} logins in {elapsed:.2f}s -> {ok / elapsed:.1f} logins/s "
+          f"(ok={ok}, rejected={logins - ok}, max loop stall={max(lag, default=0) * 1000:.0f}ms)")
+
+
+async def main(logins: int, workers: int, rounds: int):
+    hashed = bcrypt.hashpw(b"benchmark-password", bcrypt.gensalt(rounds=rounds))
+
+    async def inline_login():
+        return bcrypt.checkpw(b"benchmark-password", hashed)
+
+    hasher = PasswordHasher(workers=workers, max_pending=logins, rounds=rounds)
+
+    async def pooled_login():
+        return await hasher.verify("benchmark-password", hashed.decode("utf-8"))
+
+    print(f"bcrypt rounds={rounds}, pool workers={workers}")
+    await _run("inline", inline_login, logins)
+    await _run("pooled", pooled_login, logins)
+    hasher.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=BCRYPT_ROUNDS)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.workers, args.rounds))
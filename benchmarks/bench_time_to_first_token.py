@@ -0,0 +1,59 @@
+"""Time to first token: blocking process_query vs. process_query_stream.
+
+The fake provider waits `--latency` before the first token and `--token-delay`
+between tokens, so blocking mode sees the whole reply time while streaming
+mode sees roughly `--latency`.
+
+    python -m signup_login.benchmarks.bench_time_to_first_token --latency 0.3 --token-delay 0.05
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from signup_login.benchmarks.fake_provider import FakeProvider, start_fake_provider, use_fake_provider, attach_stub_session
+
+PORT = 8902
+
+
+async def _blocking(client) -> float:
+    start = time.perf_counter()
+    await client.process_query("hello")
+    return time.perf_counter() - start
+
+
+async def _streaming(client) -> tuple[float, float]:
+    start = time.perf_counter()
+    first = None
+    async for event in client.process_query_stream("hello"):
+        if first is None and event["type"] == "text":
+            first = time.perf_counter() - start
+    return first, time.perf_counter() - start
+
+
+async def main(turns: int, latency: float, token_delay: float):
+    use_fake_provider(PORT)
+    import client_anthropic
+    import client_gemini
+    import client_openai
+
+    runner = await start_fake_provider(FakeProvider(latency, token_delay), port=PORT)
+    try:
+        for name, module in (("anthropic", client_anthropic), ("openai", client_openai), ("gemini", client_gemini)):
+            client = attach_stub_session(module.MCPClient())
+            blocking = [await _blocking(client) for _ in range(turns)]
+            streaming = [await _streaming(client) for _ in range(turns)]
+            print(f"{name:<10} blocking first output {statistics.median(blocking) * 1000:.0f}ms | "
+                  f"streaming first token {statistics.median(s[0] for s in streaming) * 1000:.0f}ms, "
+                  f"complete {statistics.median(s[1] for s in streaming) * 1000:.0f}ms")
+    finally:
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--turns", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--token-delay", type=float, default=0.05)
+    args = parser.parse_args()
+    asyncio.run(main(args.turns, args.latency, args.token_delay))
@@ -0,0 +1,99 @@
+"""Throughput of QueuePublisher against per-key synchronous publishing.
+
+By default runs against an in-process broker stand-in with a fixed confirm
+latency; pass --rabbitmq to publish to a real broker at RABBITMQ_URL instead.
+
+    python -m signup_login.benchmarks.bench_tool_args_publisher --calls 2000
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+import aio_pika
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "client"))
+from publisher import QueuePublisher, RABBITMQ_URL  # noqa: E402
+
+
+class _FakeExchange:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def publish(self, message, routing_key):
+        await asyncio.sleep(self.latency)
+
+
+class _FakeChannel:
+    def __init__(self, latency: float):
+        self.default_exchange = _FakeExchange(latency)
+        self.is_closed = False
+
+    async def declare_exchange(self, name, type):
+        return self.default_exchange
+
+    async def get_exchange(self, name, ensure=True):
+        return self.default_exchange
+
+    async def close(self):
+        self.is_closed = True
+
+
+class _FakeConnection:
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.is_closed = False
+
+    async def channel(self, publisher_confirms=True):
+        return _FakeChannel(self.latency)
+
+    async def close(self):
+        self.is_closed = True
+
+
+TOOL_ARGS = {"name": "Ada", "email": "ada@example.com", "password": "secret", "re_password": "secret"}
+
+
+async def main(calls: int, channels: int, latency: float, rabbitmq: bool):
+    if rabbitmq:
+        connect = aio_pika.connect_robust
+    else:
+        async def connect(url):
+            return _FakeConnection(latency)
+
+    # Baseline: the old path, one confirmed publish per argument key, awaited inline
+    baseline_connection = await connect(RABBITMQ_URL)
+    channel = await baseline_connection.channel()
+    start = time.perf_counter()
+    for _ in range(calls):
+        for key, value in TOOL_ARGS.items():
+            await channel.default_exchange.publish(
+                aio_pika.Message(json.dumps({key: value}).encode()), routing_key="tool_args_bench")
+    baseline = time.perf_counter() - start
+    await baseline_connection.close()
+    print(f"per-key inline: {calls} calls in {baseline:.2f}s -> {calls / baseline:.0f} calls/s "
+          f"(caller blocked {baseline / calls * 1000:.2f}ms per call)")
+
+    publisher = QueuePublisher("tool_args_bench", channels=channels, buffer_size=calls, connect=connect)
+    await publisher.start()
+    start = time.perf_counter()
+    for _ in range(calls):
+        publisher.publish_nowait(TOOL_ARGS)
+    enqueued = time.perf_counter() - start
+    await publisher.flush()
+    drained = time.perf_counter() - start
+    await publisher.close()
+    print(f"publisher:      {calls} calls in {drained:.2f}s -> {calls / drained:.0f} calls/s "
+          f"(caller blocked {enqueued / calls * 1000:.4f}ms per call) {publisher.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=2000)
+    parser.add_argument("--channels", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.001, help="stand-in confirm latency in seconds")
+    parser.add_argument("--rabbitmq", action="store_true", help="use the real broker at RABBITMQ_URL")
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.channels, args.latency, args.rabbitmq))
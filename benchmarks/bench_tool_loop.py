@@ -0,0 +1,69 @@
+"""Client-side overhead of the model -> tools -> model loop in process_query.
+
+Each client runs turns of a scripted fake-provider scenario (by default a
+multi-call turn and a three-step chain) against a stub MCP session. The
+provider and tool latencies are fixed, so whatever the turn takes beyond
+them is the client's own work: history compaction, request conversion,
+response parsing and tool dispatch.
+
+    python -m signup_login.benchmarks.bench_tool_loop --turns 100 --latency 0.01 --tool-latency 0.005
+    python -m signup_login.benchmarks.bench_tool_loop --scenarios chain,my_script.json
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from signup_login.benchmarks.fake_provider import (FakeProvider, Scenario, StubMCPSession, attach_stub_session,
+                                                   server_tools, start_fake_provider, use_fake_provider)
+
+PORT = 8905
+
+
+async def main(scenarios: list, turns: int, latency: float, tool_latency: float):
+    use_fake_provider(PORT)
+    # Measure the loop itself, not the RabbitMQ relay
+    os.environ.setdefault("TOOL_ARGS_RELAY", "0")
+    import client_anthropic
+    import client_gemini
+    import client_openai
+
+    for scenario_name in scenarios:
+        scenario = Scenario.load(scenario_name)
+        provider = FakeProvider(latency, scenario=scenario)
+        runner = await start_fake_provider(provider, port=PORT)
+        # Model calls run one after another; the tool calls of one step run concurrently
+        rounds = sum(1 for step in scenario.steps if step.get("tool_calls"))
+        floor = provider.latency * scenario.model_calls() + tool_latency * rounds
+        print(f"{scenario_name}: {scenario.model_calls()} model calls, {scenario.tool_calls()} tool calls, "
+              f"{floor * 1000:.1f}ms provider + tool floor per turn")
+        try:
+            for name, module in (("anthropic", client_anthropic), ("openai", client_openai), ("gemini", client_gemini)):
+                session = StubMCPSession(server_tools(), tool_latency)
+                client = attach_stub_session(module.MCPClient(), session)
+                await client.process_query("warm up")
+                timings = []
+                for turn in range(turns):
+                    start = time.perf_counter()
+                    await client.process_query(f"Question number {turn}?")
+                    timings.append(time.perf_counter() - start)
+                timings.sort()
+                median = statistics.median(timings)
+                print(f"  {name:<10} p50 {median * 1000:7.2f}ms  p99 {timings[int(len(timings) * 0.99) - 1] * 1000:7.2f}ms  "
+                      f"overhead {(median - floor) * 1000:6.2f}ms/turn  "
+                      f"tool calls {session.calls // (turns + 1)}/turn")
+                await client.adapter.aclose()
+        finally:
+            await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scenarios", default="multi_call,chain", help="comma-separated names or scenario JSON files")
+    parser.add_argument("--turns", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.01, help="fake provider latency per model call")
+    parser.add_argument("--tool-latency", type=float, default=0.005, help="stub MCP latency per tool call")
+    args = parser.parse_args()
+    asyncio.run(main([name.strip() for name in args.scenarios.split(",") if name.strip()],
+                     args.turns, args.latency, args.tool_latency))
@@ -0,0 +1,68 @@
+"""Latency of the auth-path `users.find_one({"email": ...})` with and without
+the unique email index.
+
+Needs a real mongod (collection scans are what is being measured). Uses a
+scratch database that is dropped afterwards:
+
+    MONGO_DB_URL=mongodb://localhost:27017 \
+        python -m signup_login.benchmarks.bench_user_lookup --users 1000000
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from signup_login.core.db import MongoDatabase, mongo_uri
+from signup_login.core.indexes import ensure_indexes
+
+
+async def _seed(users, count: int, batch: int = 10_000):
+    for start in range(0, count, batch):
+        docs = [{"name": f"user{i}", "email": f"user{i}@example.com", "password": "x"}
+                for i in range(start, min(start + batch, count))]
+        await users.insert_many(docs, ordered=False)
+
+
+async def _measure(users, count: int, lookups: int) -> list:
+    timings = []
+    for _ in range(lookups):
+        email = f"user{random.randrange(count)}@example.com"
+        start = time.perf_counter()
+        await users.find_one({"email": email}, {"_id": 0})
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _report(label: str, timings: list):
+    timings = sorted(timings)
+    p50 = statistics.median(timings) * 1000
+    p99 = timings[int(len(timings) * 0.99) - 1] * 1000
+    print(f"{label:<10} p50={p50:.2f}ms p99={p99:.2f}ms over {len(timings)} lookups")
+
+
+async def main(count: int, lookups: int, unindexed_lookups: int):
+    database = MongoDatabase(mongo_uri, name="mcp-server-bench")
+    await database.connect()
+    try:
+        users = database.collection("users")
+        await users.drop()
+        print(f"Seeding {count} users...")
+        await _seed(users, count)
+
+        _report("no index", await _measure(users, count, unindexed_lookups))
+        await ensure_indexes(database)
+        _report("indexed", await _measure(users, count, lookups))
+    finally:
+        await database.client.drop_database("mcp-server-bench")
+        await database.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=1000)
+    # Collection scans over 1M docs are slow, so sample fewer of them
+    parser.add_argument("--unindexed-lookups", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.users, args.lookups, args.unindexed_lookups))
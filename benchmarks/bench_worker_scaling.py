@@ -0,0 +1,120 @@
+"""Auth endpoint throughput against 1, 2, 4... uvicorn workers.
+
+Starts `signup_login.serve` with each worker count, drives `/token` (or
+`/signup`) with `--concurrency` concurrent clients for `--duration` seconds,
+then stops the server with SIGTERM and times the graceful drain. Needs a
+real mongod shared by the workers; a scratch database is used and cleared:
+
+    MONGO_DB_URL=mongodb://localhost:27017 \
+        python -m signup_login.benchmarks.bench_worker_scaling --workers 1,2,4 --endpoint token
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import signal
+import statistics
+import sys
+import time
+
+import aiohttp
+
+PORT = 8910
+EMAIL = "loadtest@example.com"
+PASSWORD = "loadtest-password"
+
+
+async def _wait_ready(session: aiohttp.ClientSession, base: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            async with session.get(f"{base}/healthz") as response:
+                if response.status == 200:
+                    return
+        except aiohttp.ClientError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError(f"Server at {base} did not become ready in {timeout:.0f}s")
+
+
+async def _load(session: aiohttp.ClientSession, base: str, endpoint: str, concurrency: int, duration: float) -> dict:
+    ids = itertools.count()
+    run = int(time.time())
+    timings = []
+    statuses: dict = {}
+    deadline = time.monotonic() + duration
+
+    async def worker():
+        while time.monotonic() < deadline:
+            if endpoint == "signup":
+                email = f"load-{run}-{next(ids)}@example.com"
+                url = f"{base}/signup"
+                params = {"name": "Load Test", "email": email, "password": PASSWORD, "re_password": PASSWORD}
+            else:
+                url = f"{base}/token"
+                params = {"email": EMAIL, "password": PASSWORD}
+            start = time.perf_counter()
+            try:
+                async with session.post(url, params=params) as response:
+                    await response.read()
+                    status = response.status
+            except aiohttp.ClientError:
+                status = "error"
+            timings.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    ok = statuses.get(200, 0) + statuses.get(201, 0)
+    timings.sort()
+    return {
+        "rps": ok / elapsed,
+        "p50_ms": statistics.median(timings) * 1000,
+        "p99_ms": timings[int(len(timings) * 0.99) - 1] * 1000,
+        "statuses": statuses,
+    }
+
+
+async def _run(workers: int, endpoint: str, concurrency: int, duration: float) -> dict:
+    base = f"http://127.0.0.1:{PORT}"
+    env = {**os.environ, "MONGO_DB_NAME": "mcp-server-loadtest"}
+    process = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "signup_login.serve", "--workers", str(workers), "--port", str(PORT), env=env)
+    try:
+        connector = aiohttp.TCPConnector(limit=concurrency)
+        async with aiohttp.ClientSession(connector=connector) as session:
+            await _wait_ready(session, base)
+            if endpoint == "token":
+                await session.post(f"{base}/signup", params={
+                    "name": "Load Test", "email": EMAIL, "password": PASSWORD, "re_password": PASSWORD})
+            result = await _load(session, base, endpoint, concurrency, duration)
+            await session.get(f"{base}/clear_users")
+    finally:
+        start = time.perf_counter()
+        process.send_signal(signal.SIGTERM)
+        await process.wait()
+        drain = time.perf_counter() - start
+    result["drain_s"] = drain
+    return result
+
+
+async def main(worker_counts: list, endpoint: str, concurrency: int, duration: float):
+    baseline = None
+    for workers in worker_counts:
+        result = await _run(workers, endpoint, concurrency, duration)
+        baseline = baseline or result["rps"] / workers
+        efficiency = result["rps"] / (baseline * workers) * 100 if baseline else 0.0
+        print(f"workers={workers:<3} {result['rps']:.1f} req/s ({efficiency:.0f}% of linear) "
+              f"p50={result['p50_ms']:.1f}ms p99={result['p99_ms']:.1f}ms "
+              f"drain={result['drain_s']:.2f}s statuses={result['statuses']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--endpoint", choices=["token", "signup"], default="token")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+    asyncio.run(main([int(n) for n in args.workers.split(",")], args.endpoint, args.concurrency, args.duration))
@@ -0,0 +1,395 @@
+"""Local stand-in for the OpenAI, Anthropic and Gemini HTTP APIs.
+
+Replies follow a scripted `Scenario`: each model call within a turn gets the
+next step of the script, either text or a set of tool calls (several calls
+in one step make a multi-call turn). The step is derived from the request
+itself (how many tool-call rounds follow the last user message), so replies
+are deterministic whatever the concurrency. Requests that withhold tools get
+the script's final text. `FakeProvider.scripts` gives specific queries their
+own scenario (replay.py scripts every recorded turn this way). Streaming requests get text one word per chunk,
+`token_delay` seconds apart. Point the clients at it with:
+
+    OPENAI_BASE_URL=http://127.0.0.1:8900/v1
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8900
+    GEMINI_BASE_URL=http://127.0.0.1:8900
+
+    python -m signup_login.benchmarks.fake_provider --port 8900 --latency 0.2 --scenario multi_call
+    python -m signup_login.benchmarks.fake_provider --scenario my_script.json
+
+A scenario file is JSON (all keys optional except "steps"):
+
+    {"latency": 0.1, "tokens_per_second": 50, "jitter": 0.02, "seed": 1,
+     "steps": [{"tool_calls": [{"name": "get_users", "args": {"limit": 5}},
+                               {"name": "get_current_user", "args": {}}]},
+               {"text": "Here is what I found."}]}
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+from aiohttp import web
+
+REPLY = "This is a reply from the fake provider, streamed one word at a time to the client."
+
+
+class Scenario:
+    """A scripted turn: `steps[i]` answers the i-th model call of the turn.
+
+    Each step is {"text": str} and/or {"tool_calls": [{"name", "args"}]}, and
+    may set its own "latency"; the last step is repeated if the client keeps
+    calling. `latency`,
+    `tokens_per_second` and `jitter` (extra latency drawn uniformly from
+    [0, jitter] with a seeded RNG) override the provider's settings.
+    """
+
+    def __init__(self, steps: list, latency: float | None = None, tokens_per_second: float | None = None,
+                 jitter: float = 0.0, seed: int = 0):
+        self.steps = steps or [{"text": REPLY}]
+        self.latency = latency
+        self.tokens_per_second = tokens_per_second
+        self.jitter = jitter
+        self.random = random.Random(seed)
+
+    @classmethod
+    def load(cls, name_or_path: str) -> "Scenario":
+        """A built-in scenario by name, or a scenario JSON file."""
+        if name_or_path in SCENARIOS:
+            return cls(SCENARIOS[name_or_path])
+        with open(name_or_path, encoding="utf-8") as f:
+            spec = json.load(f)
+        return cls(spec["steps"], spec.get("latency"), spec.get("tokens_per_second"),
+                   spec.get("jitter", 0.0), spec.get("seed", 0))
+
+    def step(self, rounds: int, tools_allowed: bool) -> dict:
+        if not tools_allowed:
+            final = self.steps[-1]
+            return {"text": final.get("text", REPLY)} if final.get("tool_calls") else final
+        return self.steps[min(rounds, len(self.steps) - 1)]
+
+    def model_calls(self) -> int:
+        """Provider requests one turn of this scenario makes."""
+        return len(self.steps)
+
+    def tool_calls(self) -> int:
+        return sum(len(step.get("tool_calls", [])) for step in self.steps)
+
+
+def _call(name: str, **args) -> dict:
+    return {"name": name, "args": args}
+
+
+ANSWER = "Here is what I found using the tools."
+SCENARIOS = {
+    "text": [{"text": REPLY}],
+    "single_tool": [{"tool_calls": [_call("get_current_user")]}, {"text": ANSWER}],
+    "multi_call": [{"tool_calls": [_call("get_users", limit=5), _call("get_current_user"),
+                                   _call("list_projects", limit=5)]},
+                   {"text": ANSWER}],
+    "chain": [{"tool_calls": [_call("get_current_user")]}, {"tool_calls": [_call("list_projects", limit=5)]},
+              {"tool_calls": [_call("get_users", limit=5)]}, {"text": ANSWER}],
+}
+
+
+class FakeProvider:
+    def __init__(self, latency: float = 0.0, token_delay: float = 0.0, reply: str = REPLY,
+                 scenario: Scenario | None = None):
+        self.scenario = scenario or Scenario([{"text": reply}])
+        self.latency = latency if self.scenario.latency is None else self.scenario.latency
+        self.token_delay = token_delay if not self.scenario.tokens_per_second else 1 / self.scenario.tokens_per_second
+        self.reply = reply
+        self.requests = 0
+        self.request_bytes = []  # body size of every model request, in arrival order
+        self.tool_calls = 0
+        self.caches = 0
+        # Scenarios for specific queries (keyed by the user message text); other queries get `scenario`
+        self.scripts: dict[str, Scenario] = {}
+        self._call_ids = 0
+
+    async def _reply(self, query: str, rounds: int, tools_allowed: bool) -> tuple[str, list]:
+        """Wait out the latency of the scripted step, then return its text and numbered tool calls."""
+        self.requests += 1
+        scenario = self.scripts.get(query, self.scenario)
+        step = scenario.step(rounds, tools_allowed)
+        latency = step.get("latency", self.latency if scenario.latency is None else scenario.latency)
+        if scenario.jitter:
+            latency += scenario.random.uniform(0, scenario.jitter)
+        if latency:
+            await asyncio.sleep(latency)
+
+        calls = step.get("tool_calls", []) if tools_allowed else []
+        self.tool_calls += len(calls)
+        numbered = []
+        for call in calls:
+            self._call_ids += 1
+            numbered.append((self._call_ids, call))
+        return step.get("text", "" if calls else self.reply), numbered
+
+    @staticmethod
+    def _tokens(text: str) -> list:
+        if not text:
+            return []
+        words = text.split(" ")
+        return [word if i == 0 else " " + word for i, word in enumerate(words)]
+
+    async def _sse(self, request: web.Request, events):
+        """Write `(event_name | None, payload)` pairs as server-sent events."""
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for i, (event, payload) in enumerate(events):
+            if i and self.token_delay:
+                await asyncio.sleep(self.token_delay)
+            data = payload if isinstance(payload, str) else json.dumps(payload)
+            prefix = f"event: {event}\n" if event else ""
+            await response.write(f"{prefix}data: {data}\n\n".encode("utf-8"))
+        await response.write_eof()
+        return response
+
+    async def openai_chat(self, request: web.Request):
+        self.request_bytes.append(len(await request.read()))
+        body = await request.json()
+        messages = body.get("messages", [])
+        last_user = max((i for i, m in enumerate(messages) if m.get("role") == "user"), default=-1)
+        query = messages[last_user]["content"] if last_user >= 0 else ""
+        rounds = sum(1 for m in messages[last_user + 1:] if m.get("role") == "assistant" and m.get("tool_calls"))
+        text, calls = await self._reply(query if isinstance(query, str) else "", rounds,
+                                        bool(body.get("tools")) and body.get("tool_choice") != "none")
+        finish_reason = "tool_calls" if calls else "stop"
+        tool_calls = [{"id": f"call_fake_{call_id}", "type": "function",
+                       "function": {"name": call["name"], "arguments": json.dumps(call["args"])}}
+                      for call_id, call in calls]
+
+        model = body.get("model", "fake")
+        completion_id = f"chatcmpl-fake-{self.requests}"
+        if body.get("stream"):
+            def chunk(delta, finish_reason=None):
+                return None, {"id": completion_id, "object": "chat.completion.chunk", "created": 0, "model": model,
+                              "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+            events = [chunk({"role": "assistant", "content": token}) for token in self._tokens(text)]
+            events += [chunk({"role": "assistant", "tool_calls": [{"index": i, **tool_call}]})
+                       for i, tool_call in enumerate(tool_calls)]
+            events += [chunk({}, finish_reason), (None, "[DONE]")]
+            return await self._sse(request, events)
+        message = {"role": "assistant", "content": text or None}
+        if tool_calls:
+            message["tool_calls"] = tool_calls
+        return web.json_response({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": 0,
+            "model": model,
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+        })
+
+    async def anthropic_messages(self, request: web.Request):
+        self.request_bytes.append(len(await request.read()))
+        body = await request.json()
+        messages = body.get("messages", [])
+
+        def is_query(m):
+            # User messages that only carry tool results continue the turn
+            content = m.get("content")
+            return m.get("role") == "user" and (
+                isinstance(content, str) or any(block.get("type") == "text" for block in content))
+
+        last_user = max((i for i, m in enumerate(messages) if is_query(m)), default=-1)
+        content = messages[last_user]["content"] if last_user >= 0 else ""
+        query = content if isinstance(content, str) else "".join(
+            block["text"] for block in content if block.get("type") == "text")
+        rounds = sum(1 for m in messages[last_user + 1:] if m.get("role") == "assistant")
+        tools_allowed = bool(body.get("tools")) and (body.get("tool_choice") or {}).get("type") != "none"
+        text, calls = await self._reply(query, rounds, tools_allowed)
+        blocks = [{"type": "text", "text": text}] if text else []
+        blocks += [{"type": "tool_use", "id": f"toolu_fake_{call_id}", "name": call["name"], "input": call["args"]}
+                   for call_id, call in calls]
+        stop_reason = "tool_use" if calls else "end_turn"
+
+        message = {
+            "id": f"msg_fake_{self.requests}",
+            "type": "message",
+            "role": "assistant",
+            "model": body.get("model", "fake"),
+            "content": blocks,
+            "stop_reason": stop_reason,
+            "stop_sequence": None,
+            "usage": {"input_tokens": 1, "output_tokens": 1},
+        }
+        if body.get("stream"):
+            start = {**message, "content": [], "stop_reason": None, "usage": {"input_tokens": 1, "output_tokens": 0}}
+            events = [("message_start", {"type": "message_start", "message": start})]
+            for index, block in enumerate(blocks):
+                if block["type"] == "text":
+                    events.append(("content_block_start", {"type": "content_block_start", "index": index,
+                                                           "content_block": {"type": "text", "text": ""}}))
+                    events += [("content_block_delta", {"type": "content_block_delta", "index": index,
+                                                        "delta": {"type": "text_delta", "text": token}})
+                               for token in self._tokens(block["text"])]
+                else:
+                    events.append(("content_block_start", {"type": "content_block_start", "index": index,
+                                                           "content_block": {**block, "input": {}}}))
+                    events.append(("content_block_delta", {"type": "content_block_delta", "index": index,
+                                                           "delta": {"type": "input_json_delta",
+                                                                     "partial_json": json.dumps(block["input"])}}))
+                events.append(("content_block_stop", {"type": "content_block_stop", "index": index}))
+            events += [("message_delta", {"type": "message_delta",
+                                          "delta": {"stop_reason": stop_reason, "stop_sequence": None},
+                                          "usage": {"output_tokens": len(self._tokens(text)) + len(calls)}}),
+                       ("message_stop", {"type": "message_stop"})]
+            return await self._sse(request, events)
+        return web.json_response(message)
+
+    async def gemini_generate(self, request: web.Request):
+        # Path is /v1beta/models/<model>:generateContent or :streamGenerateContent
+        self.request_bytes.append(len(await request.read()))
+        body = await request.json()
+        contents = body.get("contents", [])
+
+        def is_query(content):
+            return content.get("role") == "user" and any("text" in part for part in content.get("parts", []))
+
+        last_user = max((i for i, c in enumerate(contents) if is_query(c)), default=-1)
+        query = "".join(part.get("text", "") for part in contents[last_user]["parts"]) if last_user >= 0 else ""
+        rounds = sum(1 for c in contents[last_user + 1:]
+                     if c.get("role") == "model" and any("functionCall" in part for part in c.get("parts", [])))
+        mode = ((body.get("toolConfig") or {}).get("functionCallingConfig") or {}).get("mode")
+        tools_allowed = bool(body.get("tools") or body.get("cachedContent")) and mode != "NONE"
+        text, calls = await self._reply(query, rounds, tools_allowed)
+        call_parts = [{"functionCall": {"name": call["name"], "args": call["args"]}} for _, call in calls]
+
+        def response(parts, finish_reason=None):
+            candidate = {"content": {"role": "model", "parts": parts}, "index": 0}
+            if finish_reason:
+                candidate["finishReason"] = finish_reason
+            return {"candidates": [candidate],
+                    "usageMetadata": {"promptTokenCount": 1, "candidatesTokenCount": 1, "totalTokenCount": 2}}
+
+        if request.match_info["target"].endswith(":streamGenerateContent"):
+            chunks = [[{"text": token}] for token in self._tokens(text)]
+            if call_parts:
+                chunks.append(call_parts)
+            if not self.token_delay:
+                # google-genai parses every chunk aiohttp hands it as one JSON document, so events
+                # written back to back arrive glued together; with no delay between them, send one
+                chunks = [([{"text": text}] if text else []) + call_parts]
+            events = [(None, response(parts, "STOP" if i == len(chunks) - 1 else None))
+                      for i, parts in enumerate(chunks)]
+            return await self._sse(request, events)
+        parts = ([{"text": text}] if text else []) + call_parts
+        return web.json_response(response(parts, "STOP"))
+
+    async def gemini_create_cache(self, request: web.Request):
+        body = await request.json()
+        self.caches += 1
+        return web.json_response({
+            "name": f"cachedContents/fake-{self.caches}",
+            "model": body.get("model", "fake"),
+            "displayName": body.get("displayName", ""),
+        })
+
+    async def gemini_delete_cache(self, request: web.Request):
+        return web.json_response({})
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post("/v1/chat/completions", self.openai_chat)
+        app.router.add_post("/v1/messages", self.anthropic_messages)
+        app.router.add_post("/v1beta/models/{target}", self.gemini_generate)
+        app.router.add_post("/v1beta/cachedContents", self.gemini_create_cache)
+        app.router.add_delete("/v1beta/cachedContents/{name}", self.gemini_delete_cache)
+        return app
+
+
+async def start_fake_provider(provider: FakeProvider, host: str = "127.0.0.1", port: int = 8900) -> web.AppRunner:
+    """Serve `provider` in the running loop; call `await runner.cleanup()` to stop it."""
+    runner = web.AppRunner(provider.app())
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    return runner
+
+
+def server_tools() -> list:
+    """MCP tool declarations shaped like the server's, for StubMCPSession."""
+    def tool(name, description, /, **properties):
+        return SimpleNamespace(name=name, description=description, inputSchema={
+            "type": "object",
+            "properties": {key: {"type": kind, "description": text} for key, (kind, text) in properties.items()},
+            "required": [],
+        })
+    return [
+        tool("signup", "Create a new user account.", name=("string", "Full name"), email=("string", "Email address"),
+             password=("string", "Password"), re_password=("string", "Password again")),
+        tool("login", "Log in and return an access token.", email=("string", "Email address"),
+             password=("string", "Password")),
+        tool("get_current_user", "Return the logged in user."),
+        tool("get_users", "List registered users, one page at a time.", limit=("integer", "Page size"),
+             after=("string", "Email to continue after")),
+        tool("create_project", "Create a project for the logged in user.", project_name=("string", "Project name"),
+             project_description=("string", "What the project is about")),
+        tool("list_projects", "List the logged in user's projects.", limit=("integer", "Page size"),
+             after=("string", "Project name to continue after")),
+    ]
+
+
+class StubMCPSession:
+    """Stands in for the MCP ClientSession.
+
+    Advertises `tools` and answers every call_tool with a short text result
+    after `tool_latency` seconds.
+    """
+
+    def __init__(self, tools: list | None = None, tool_latency: float = 0.0):
+        self.tools = tools or []
+        self.tool_latency = tool_latency
+        self.calls = 0
+
+    async def list_tools(self):
+        return SimpleNamespace(tools=self.tools)
+
+    async def call_tool(self, name, arguments):
+        self.calls += 1
+        if self.tool_latency:
+            await asyncio.sleep(self.tool_latency)
+        return SimpleNamespace(content=[SimpleNamespace(type="text", text=json.dumps({"tool": name, "args": arguments}))])
+
+
+def use_fake_provider(port: int):
+    """Point the clients at a fake provider on `port` and make them importable.
+
+    Must run before the client modules (and their SDK clients) are created.
+    """
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{port}/v1"
+    os.environ["ANTHROPIC_BASE_URL"] = f"http://127.0.0.1:{port}"
+    os.environ["GEMINI_BASE_URL"] = f"http://127.0.0.1:{port}"
+    os.environ.setdefault("OPENAI_API_KEY", "fake")
+    os.environ.setdefault("ANTHROPIC_API_KEY", "fake")
+    os.environ.setdefault("GOOGLE_API_KEY", "fake")
+    client_dir = str(Path(__file__).resolve().parent.parent / "client")
+    if client_dir not in sys.path:
+        sys.path.insert(0, client_dir)
+
+
+def attach_stub_session(client, session=None):
+    session = session or StubMCPSession()
+    client.session = client.tool_catalog.session = client.tool_dispatcher.session = session
+    return client
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--token-delay", type=float, default=0.0)
+    parser.add_argument("--tokens-per-second", type=float, help="overrides --token-delay")
+    parser.add_argument("--scenario", default="text", help=f"one of {', '.join(SCENARIOS)} or a scenario JSON file")
+    args = parser.parse_args()
+    scenario = Scenario.load(args.scenario)
+    if args.tokens_per_second:
+        scenario.tokens_per_second = args.tokens_per_second
+    provider = FakeProvider(args.latency, args.token_delay, scenario=scenario)
+    web.run_app(provider.app(), host=args.host, port=args.port)
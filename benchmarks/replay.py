@@ -0,0 +1,229 @@
+"""Replay recorded client sessions against the server and the fake provider.
+
+Record real sessions by running a client with SESSION_RECORD_FILE set (see
+client/recorder.py); each line of that file is one turn with its query, the
+tool calls the model made (with their arguments) and the time each model
+call took. This tool replays such a file: the fake provider is scripted to
+make the same tool calls with the same model latency, and the calls run
+for real against the MCP server, through an MCPClientPool like production
+traffic. Conversations replay concurrently and their turns keep their
+recorded spacing, compressed by --speedup; turns that can't start on time
+(more than --concurrency in flight) show up as schedule lag.
+
+Credential arguments are redacted in recordings. Replay fills every one of
+them (redacted or, in older recordings, not) with the same synthetic value,
+so a recorded signup followed by a login still works and real passwords are
+never sent.
+
+Tool latency is reported per operation_id (fastapi-mcp names each tool after
+its route's operation_id), next to the recorded distribution, so a change
+that slows a tool down shows up as a regression.
+
+    python -m signup_login.benchmarks.replay sessions.jsonl --speedup 10 --concurrency 32 --json replay.json
+    python -m signup_login.benchmarks.replay sessions.jsonl --server-url http://localhost:8000 --compare replay.json
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import platform
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+
+from signup_login.benchmarks.fake_provider import FakeProvider, Scenario, start_fake_provider, use_fake_provider
+from signup_login.benchmarks.suite import _compare, _git_commit, _start_server, _summary, _use_local_stand_ins
+
+SERVER_PORT = 8930
+PROVIDER_PORT = 8931
+# Stands in for every recorded password or token
+SYNTHETIC_SECRET = "replay-Secret-1"
+CLIENTS = {"openai": ("adapter_openai", "OpenAIAdapter"),
+           "anthropic": ("adapter_anthropic", "AnthropicAdapter"),
+           "gemini": ("adapter_gemini", "GeminiAdapter")}
+
+
+def load_turns(path: str) -> list:
+    """Recorded turns from `path`, oldest first; lines that aren't turn records are skipped."""
+    turns = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if isinstance(record, dict) and {"query", "steps", "start"} <= record.keys():
+                turns.append(record)
+    if not turns:
+        raise ValueError(f"{path} contains no recorded turns (record them with SESSION_RECORD_FILE)")
+    return sorted(turns, key=lambda turn: turn["start"])
+
+
+def _synthetic_credentials(args):
+    from recorder import SECRET_ARGS
+
+    if isinstance(args, dict):
+        return {key: SYNTHETIC_SECRET if key.lower() in SECRET_ARGS else _synthetic_credentials(value)
+                for key, value in args.items()}
+    if isinstance(args, list):
+        return [_synthetic_credentials(value) for value in args]
+    return args
+
+
+def _script(turn: dict, speedup: float, provider_latency: float | None) -> Scenario:
+    """A fake-provider scenario repeating the model calls of a recorded turn."""
+    steps = []
+    for step in turn["steps"]:
+        latency = provider_latency if provider_latency is not None else step["llm_ms"] / 1000 / speedup
+        calls = [{"name": call["name"], "args": _synthetic_credentials(call["args"])} for call in step["tool_calls"]]
+        steps.append({"tool_calls": calls, "latency": latency} if calls else {"latency": latency})
+    if not steps or steps[-1].get("tool_calls"):
+        # The recorded turn ended without a final answer (step limit or error); close it with text
+        steps.append({"latency": provider_latency or 0.0})
+    return Scenario(steps)
+
+
+def _recorded_tools(turns: list) -> dict:
+    timings = defaultdict(list)
+    for turn in turns:
+        for step in turn["steps"]:
+            for call in step["tool_calls"]:
+                # Calls answered by the client's tool cache never reached the server
+                if not call.get("cached"):
+                    timings[call["name"]].append(call["elapsed_ms"] / 1000)
+    return {name: _summary(values) for name, values in sorted(timings.items())}
+
+
+async def replay(turns: list, server_url: str, args) -> dict:
+    use_fake_provider(PROVIDER_PORT)
+    from pool import MCPClientPool
+
+    provider = FakeProvider(args.provider_latency or 0.0)
+    # Queries are numbered so every replayed turn gets its own script, even when users repeat themselves
+    queries = []
+    for index, turn in enumerate(turns):
+        query = f"{turn['query']} #{index}"
+        provider.scripts[query] = _script(turn, args.speedup, args.provider_latency)
+        queries.append(query)
+    conversations = defaultdict(list)
+    for index, turn in enumerate(turns):
+        conversations[turn["conversation"]].append(index)
+
+    module, adapter_class = CLIENTS[args.client]
+    adapter = getattr(importlib.import_module(module), adapter_class)()
+    runner = await start_fake_provider(provider, port=PROVIDER_PORT)
+    pool = MCPClientPool(adapter, f"{server_url}/mcp", size=args.pool_size)
+    semaphore = asyncio.Semaphore(args.concurrency)
+    turn_timings, lag = [], []
+    tool_timings = defaultdict(list)
+    tool_errors = defaultdict(int)
+    failed_turns = 0
+
+    async def run_conversation(conversation_id, indexes):
+        nonlocal failed_turns
+        for index in indexes:
+            # Keep the recorded spacing between turns, compressed by the speed-up
+            due = replay_start + (turns[index]["start"] - first_start) / args.speedup
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            async with semaphore:
+                # How late the turn starts: the replay can't keep up with the recorded rate
+                start = time.perf_counter()
+                lag.append(max(0.0, start - due))
+                try:
+                    async for event in pool.chat_stream(f"replay-{conversation_id}", queries[index]):
+                        if event["type"] == "tool_result" and not event["cached"]:
+                            tool_timings[event["name"]].append(event["elapsed"])
+                            tool_errors[event["name"]] += event["is_error"]
+                except Exception as e:
+                    failed_turns += 1
+                    print(f"Error replaying turn {index}: {e}")
+                    continue
+                turn_timings.append(time.perf_counter() - start)
+
+    try:
+        await pool.start()
+        first_start = turns[0]["start"]
+        replay_start = time.perf_counter()
+        await asyncio.gather(*(run_conversation(conversation_id, indexes)
+                               for conversation_id, indexes in conversations.items()))
+        elapsed = time.perf_counter() - replay_start
+    finally:
+        await pool.close()
+        await runner.cleanup()
+
+    return {
+        "turns": len(turns),
+        "conversations": len(conversations),
+        "failed_turns": failed_turns,
+        "elapsed_s": round(elapsed, 3),
+        "turn": _summary(turn_timings, elapsed) if turn_timings else {},
+        "schedule_lag": _summary(lag),
+        "tools": {name: {**_summary(values), "errors": tool_errors[name]}
+                  for name, values in sorted(tool_timings.items())},
+        "recorded_tools": _recorded_tools(turns),
+        "model_calls": provider.requests,
+    }
+
+
+def _print_report(results: dict):
+    print(f"\n{results['turns']} turns in {results['conversations']} conversations replayed in {results['elapsed_s']}s "
+          f"({results['failed_turns']} failed)")
+    if results["turn"]:
+        turn = results["turn"]
+        print(f"turn latency: p50 {turn['p50_ms']}ms  p90 {turn['p90_ms']}ms  p99 {turn['p99_ms']}ms  "
+              f"({turn['rps']} turns/s)")
+    print(f"schedule lag p99: {results['schedule_lag']['p99_ms']}ms")
+    print(f"\n{'operation_id':<24} {'calls':>6} {'errors':>6} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} "
+          f"{'max ms':>9} {'recorded p50':>13}")
+    for name, tool in results["tools"].items():
+        recorded = results["recorded_tools"].get(name, {}).get("p50_ms", "-")
+        print(f"{name:<24} {tool['count']:>6} {tool['errors']:>6} {tool['p50_ms']:>9} {tool['p90_ms']:>9} "
+              f"{tool['p99_ms']:>9} {tool['max_ms']:>9} {recorded:>13}")
+
+
+async def main(args) -> dict:
+    turns = load_turns(args.path)
+    if args.server_url:
+        return await replay(turns, args.server_url.rstrip("/"), args)
+
+    _use_local_stand_ins()
+    server, task = await _start_server(SERVER_PORT)
+    try:
+        return await replay(turns, f"http://127.0.0.1:{SERVER_PORT}", args)
+    finally:
+        server.should_exit = True
+        await task
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", help="JSONL file recorded with SESSION_RECORD_FILE")
+    parser.add_argument("--speedup", type=float, default=1.0, help="compress recorded time (gaps and model latency) by this factor")
+    parser.add_argument("--concurrency", type=int, default=64, help="turns in flight at once")
+    parser.add_argument("--provider-latency", type=float, help="fixed fake provider latency instead of the recorded one")
+    parser.add_argument("--client", choices=CLIENTS, default="openai")
+    parser.add_argument("--pool-size", type=int, default=4, help="MCP sessions in the client pool")
+    parser.add_argument("--server-url", help="replay against a running server instead of an in-process one")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="previous --json output to compare against")
+    args = parser.parse_args()
+    if args.speedup <= 0:
+        parser.error("--speedup must be positive")
+
+    results = asyncio.run(main(args))
+    _print_report(results)
+    document = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("json", "compare")},
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+        print(f"Wrote {args.json}")
+    if args.compare:
+        _compare(results, args.compare)
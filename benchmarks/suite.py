@@ -0,0 +1,318 @@
+"""End-to-end benchmark suite: the server and a client in one process.
+
+Serves `signup_login.main:app` with uvicorn inside the benchmark's event loop,
+backed by local stand-ins: mongomock (or a real mongod via MONGO_DB_URL), an
+in-memory replacement for the RabbitMQ consumers, and the fake LLM provider.
+Scenarios:
+
+    auth        /signup and /token throughput, p50/p99
+    users_me    bearer-token auth overhead of /users/me over /healthz
+    mcp         MCP list_tools / call_tool round trips over SSE
+    websocket   /ws/tool_args fan-out rate
+    client      full process_query turn latency through the OpenAI client
+
+Results are printed and, with --json, written as one JSON document; pass a
+previous file to --compare to print the change per metric.
+
+    python -m signup_login.benchmarks.suite --json bench.json
+    python -m signup_login.benchmarks.suite --only auth,mcp --compare bench.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timezone
+
+import aiohttp
+
+from signup_login.benchmarks.fake_provider import FakeProvider, start_fake_provider, use_fake_provider
+
+SERVER_PORT = 8920
+PROVIDER_PORT = 8921
+PASSWORD = "bench-password"
+
+
+def _summary(timings: list, elapsed: float | None = None) -> dict:
+    timings = sorted(timings)
+    result = {
+        "count": len(timings),
+        "p50_ms": round(statistics.median(timings) * 1000, 3),
+        "p90_ms": round(timings[max(0, int(len(timings) * 0.9) - 1)] * 1000, 3),
+        "p99_ms": round(timings[max(0, int(len(timings) * 0.99) - 1)] * 1000, 3),
+        "max_ms": round(timings[-1] * 1000, 3),
+        "mean_ms": round(statistics.fmean(timings) * 1000, 3),
+    }
+    if elapsed:
+        result["rps"] = round(len(timings) / elapsed, 1)
+    return result
+
+
+async def _concurrently(count: int, concurrency: int, request) -> tuple[list, float]:
+    """Run `request(i)` for i in range(count), `concurrency` at a time; return timings and wall time."""
+    semaphore = asyncio.Semaphore(concurrency)
+    timings = []
+
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            await request(i)
+            timings.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(count)))
+    return timings, time.perf_counter() - start
+
+
+class InMemoryMessage:
+    """Enough of an aio-pika incoming message for QueueConsumer._on_message."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+
+    async def ack(self):
+        pass
+
+
+def _use_in_memory_amqp():
+    """Keep the lifespan from dialling RabbitMQ; messages are fed to the consumers directly."""
+    from signup_login.core.broker import tool_args_consumer, chat_stream_consumer
+    from signup_login.auth.auth import auth_invalidation_consumer
+
+    async def noop():
+        pass
+
+    for consumer in (tool_args_consumer, chat_stream_consumer, auth_invalidation_consumer):
+        consumer.start = consumer.stop = noop
+
+
+def _use_local_stand_ins():
+    """Stand-ins and cheap settings for the in-process server, unless the environment asks otherwise."""
+    os.environ.setdefault("MONGO_DB_URL", "mongomock://")
+    os.environ.setdefault("BCRYPT_ROUNDS", "4")
+    os.environ.setdefault("STORE_URL", "memory://")
+    os.environ.setdefault("TOOL_ARGS_RELAY", "0")
+    os.environ.setdefault("STREAM_RELAY", "0")
+    os.environ.setdefault("STREAM_RESPONSES", "0")
+    _use_in_memory_amqp()
+
+
+async def _start_server(port: int):
+    import uvicorn
+    from signup_login.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        if task.done():
+            task.result()
+        await asyncio.sleep(0.05)
+    return server, task
+
+
+async def bench_auth(base: str, args) -> dict:
+    run = int(time.time())
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=args.concurrency)) as http:
+        async def signup(i):
+            async with http.post(f"{base}/signup", params={
+                    "name": f"Bench {i}", "email": f"bench-{run}-{i}@example.com",
+                    "password": PASSWORD, "re_password": PASSWORD}) as response:
+                response.raise_for_status()
+
+        async def login(i):
+            async with http.post(f"{base}/token", params={
+                    "email": f"bench-{run}-{i}@example.com", "password": PASSWORD}) as response:
+                response.raise_for_status()
+
+        signup_timings, signup_elapsed = await _concurrently(args.requests, args.concurrency, signup)
+        login_timings, login_elapsed = await _concurrently(args.requests, args.concurrency, login)
+    return {"signup": _summary(signup_timings, signup_elapsed), "login": _summary(login_timings, login_elapsed)}
+
+
+async def _token(http: aiohttp.ClientSession, base: str) -> str:
+    email = f"bench-token-{time.time_ns()}@example.com"
+    async with http.post(f"{base}/signup", params={
+            "name": "Bench", "email": email, "password": PASSWORD, "re_password": PASSWORD}) as response:
+        response.raise_for_status()
+    async with http.post(f"{base}/token", params={"email": email, "password": PASSWORD}) as response:
+        return (await response.json())["access_token"]
+
+
+async def bench_users_me(base: str, args) -> dict:
+    async with aiohttp.ClientSession() as http:
+        headers = {"Authorization": f"Bearer {await _token(http, base)}"}
+
+        async def get(path, **kwargs):
+            async with http.get(f"{base}{path}", **kwargs) as response:
+                await response.read()
+
+        baseline, _ = await _concurrently(args.requests, 1, lambda i: get("/healthz"))
+        authed, _ = await _concurrently(args.requests, 1, lambda i: get("/users/me", headers=headers))
+    result = {"healthz": _summary(baseline), "users_me": _summary(authed)}
+    result["auth_overhead_p50_ms"] = round(result["users_me"]["p50_ms"] - result["healthz"]["p50_ms"], 3)
+    return result
+
+
+async def bench_mcp(base: str, args) -> dict:
+    from mcp import ClientSession
+    from mcp.client.sse import sse_client
+
+    async with sse_client(url=f"{base}/mcp") as streams:
+        async with ClientSession(*streams) as session:
+            await session.initialize()
+            list_tools, _ = await _concurrently(args.requests, 1, lambda i: session.list_tools())
+            call_tool, _ = await _concurrently(args.requests, 1, lambda i: session.call_tool("get_users", {"limit": 10}))
+            concurrent, elapsed = await _concurrently(
+                args.requests, args.concurrency, lambda i: session.call_tool("get_users", {"limit": 10}))
+    return {"list_tools": _summary(list_tools), "call_tool": _summary(call_tool),
+            "call_tool_concurrent": _summary(concurrent, elapsed)}
+
+
+async def bench_websocket(base: str, args) -> dict:
+    from signup_login.core.broker import tool_args_consumer, tool_args_hub
+
+    subscribers = args.subscribers
+    messages = args.requests
+    received = [0] * subscribers
+    async with aiohttp.ClientSession() as http:
+        sockets = [await http.ws_connect(f"{base.replace('http', 'ws')}/ws/tool_args") for _ in range(subscribers)]
+        while len(tool_args_hub.subscribers) < subscribers:
+            await asyncio.sleep(0.01)
+
+        async def drain(index, socket):
+            while received[index] < messages:
+                message = await socket.receive()
+                if message.type != aiohttp.WSMsgType.TEXT:
+                    return
+                received[index] += 1
+
+        readers = [asyncio.create_task(drain(i, socket)) for i, socket in enumerate(sockets)]
+        start = time.perf_counter()
+        for i in range(messages):
+            await tool_args_consumer._on_message(InMemoryMessage(json.dumps({"n": i}).encode()))
+            # Yield so the per-socket senders keep up instead of hitting the overflow policy
+            await asyncio.sleep(0)
+        try:
+            await asyncio.wait_for(asyncio.gather(*readers), timeout=30)
+        except asyncio.TimeoutError:
+            pass
+        elapsed = time.perf_counter() - start
+        for socket in sockets:
+            await socket.close()
+    delivered = sum(received)
+    return {
+        "subscribers": subscribers,
+        "messages": messages,
+        "delivered": delivered,
+        "dropped": subscribers * messages - delivered,
+        "deliveries_per_s": round(delivered / elapsed, 1),
+    }
+
+
+async def bench_client(base: str, args) -> dict:
+    use_fake_provider(PROVIDER_PORT)
+    import client_openai
+
+    runner = await start_fake_provider(FakeProvider(args.latency), port=PROVIDER_PORT)
+    client = client_openai.MCPClient()
+    try:
+        await client.connect_to_sse_server(f"{base}/mcp")
+        timings, _ = await _concurrently(args.requests, 1, lambda i: client.process_query(f"hello {i}"))
+        concurrent, elapsed = await _concurrently(
+            args.requests, args.concurrency, lambda i: client.process_query(f"hello {i}"))
+    finally:
+        await client.cleanup()
+        await runner.cleanup()
+    result = {"turn": _summary(timings), "turn_concurrent": _summary(concurrent, elapsed),
+              "provider_latency_ms": args.latency * 1000}
+    result["client_overhead_p50_ms"] = round(result["turn"]["p50_ms"] - args.latency * 1000, 3)
+    return result
+
+
+SCENARIOS = {
+    "auth": bench_auth,
+    "users_me": bench_users_me,
+    "mcp": bench_mcp,
+    "websocket": bench_websocket,
+    "client": bench_client,
+}
+
+
+def _flatten(results: dict, prefix: str = "") -> dict:
+    flat = {}
+    for key, value in results.items():
+        if isinstance(value, dict):
+            flat.update(_flatten(value, f"{prefix}{key}."))
+        elif isinstance(value, (int, float)):
+            flat[f"{prefix}{key}"] = value
+    return flat
+
+
+def _compare(current: dict, previous_path: str):
+    with open(previous_path, encoding="utf-8") as f:
+        previous = _flatten(json.load(f)["results"])
+    print(f"\nChange vs {previous_path}:")
+    for key, value in _flatten(current).items():
+        if key in previous and previous[key]:
+            change = (value - previous[key]) / previous[key] * 100
+            print(f"  {key:<45} {previous[key]:>10} -> {value:>10} ({change:+.1f}%)")
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__)).stdout.strip() or None
+    except OSError:
+        return None
+
+
+async def main(args) -> dict:
+    _use_local_stand_ins()
+
+    base = f"http://127.0.0.1:{SERVER_PORT}"
+    server, task = await _start_server(SERVER_PORT)
+    results = {}
+    try:
+        for name in args.only:
+            print(f"Running {name}...")
+            results[name] = await SCENARIOS[name](base, args)
+            print(json.dumps(results[name], indent=2))
+    finally:
+        server.should_exit = True
+        await task
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", default=",".join(SCENARIOS), help="comma-separated scenarios")
+    parser.add_argument("--requests", type=int, default=200, help="requests/messages/turns per measurement")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--subscribers", type=int, default=20, help="websocket clients for the fan-out scenario")
+    parser.add_argument("--latency", type=float, default=0.02, help="fake provider latency in seconds")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="previous --json output to compare against")
+    args = parser.parse_args()
+    args.only = [name.strip() for name in args.only.split(",") if name.strip()]
+    unknown = set(args.only) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = asyncio.run(main(args))
+    document = {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "params": {k: v for k, v in vars(args).items() if k not in ("json", "compare")},
+        "results": results,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+        print(f"Wrote {args.json}")
+    if args.compare:
+        _compare(results, args.compare)
@@ -0,0 +1,76 @@
+import os
+
+from anthropic import AsyncAnthropic
+
+from engine import ProviderAdapter
+from http_pool import shared_http_client, LLM_TIMEOUT_SECONDS
+
+EMPTY_ASSISTANT_TEXT = "(no response)"
+
+
+class AnthropicAdapter(ProviderAdapter):
+    name = "anthropic"
+
+    def __init__(self, model: str = "claude-3-5-sonnet-20241022", max_tokens: int = 1000):
+        super().__init__(model)
+        self.max_tokens = max_tokens
+        self.anthropic = AsyncAnthropic(
+            api_key=os.environ.get("ANTHROPIC_API_KEY"),
+            http_client=shared_http_client(),
+            timeout=LLM_TIMEOUT_SECONDS,
+        )
+
+    def convert_tools(self, mcp_tools: list) -> list:
+        return [{
+            "name": tool.name,
+            "description": tool.description,
+            "input_schema": tool.inputSchema
+        } for tool in mcp_tools]
+
+    def to_native(self, messages: list) -> list:
+        native = []
+        for message in messages:
+            if message["role"] == "tool":
+                block = {
+                    "type": "tool_result",
+                    "tool_use_id": message["tool_call_id"],
+                    "content": message["content"],
+                    "is_error": message.get("is_error", False)
+                }
+                # Results for one assistant turn all go back in a single user message
+                if native and native[-1]["role"] == "user" and isinstance(native[-1]["content"], list):
+                    native[-1]["content"].append(block)
+                else:
+                    native.append({"role": "user", "content": [block]})
+            elif message["role"] == "assistant":
+                text = message["content"] if message["content"] and message["content"].strip() else ""
+                content = [{"type": "text", "text": text}] if text else []
+                content += [{"type": "tool_use", "id": call["id"], "name": call["name"], "input": call["args"]}
+                            for call in message.get("tool_calls", [])]
+                if not content:
+                    # Anthropic rejects an empty assistant turn (and blank text blocks), which would
+                    # break every later request in the conversation; keep the turn with a placeholder
+                    content = [{"type": "text", "text": EMPTY_ASSISTANT_TEXT}]
+                native.append({"role": "assistant", "content": content})
+            else:
+                native.append({"role": "user", "content": message["content"]})
+        return native
+
+    async def stream(self, messages: list, tools, allow_tools: bool = True):
+        extra = {"tools": tools, "tool_choice": {"type": "auto" if allow_tools else "none"}} if tools else {}
+        async with self.anthropic.messages.stream(
+            model=self.model,
+            max_tokens=self.max_tokens,
+            messages=self.to_native(messages),
+            **extra
+        ) as stream:
+            async for text in stream.text_stream:
+                yield {"type": "text", "text": text}
+            response = await stream.get_final_message()
+
+        yield {
+            "type": "turn_end",
+            "text": "".join(content.text for content in response.content if content.type == "text"),
+            "tool_calls": [{"id": content.id, "name": content.name, "args": content.input}
+                           for content in response.content if content.type == "tool_use"]
+        }
@@ -0,0 +1,254 @@
+import itertools
+import json
+import os
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+from google import genai
+from google.genai import types as genai_types
+
+from engine import ProviderAdapter
+from http_pool import GEMINI_BASE_URL, LLM_TIMEOUT_SECONDS
+
+load_dotenv()
+# Keep one Gemini chat per conversation and only convert the new messages each turn
+GEMINI_CHAT_SESSION = os.environ.get("GEMINI_CHAT_SESSION", "1") != "0"
+# Chats kept per adapter (one per live conversation, least recently used dropped first)
+GEMINI_CHAT_SESSIONS = int(os.environ.get("GEMINI_CHAT_SESSIONS", "256"))
+# Put the tool declarations in a provider-side context cache (needs a model and
+# declaration size the cache API accepts; falls back to inline tools otherwise)
+GEMINI_CONTEXT_CACHE = os.environ.get("GEMINI_CONTEXT_CACHE", "0") == "1"
+GEMINI_CONTEXT_CACHE_TTL_SECONDS = int(os.environ.get("GEMINI_CONTEXT_CACHE_TTL_SECONDS", "3600"))
+
+# Map JSON schema types to Gemini types
+TYPE_MAPPING = {
+    "number": "NUMBER",
+    "integer": "INTEGER",
+    "boolean": "BOOLEAN",
+    "array": "ARRAY",
+    "object": "OBJECT",
+}
+
+# Gemini function calls usually come without ids, so the engine gets synthetic ones
+_call_ids = itertools.count(1)
+
+
+class GeminiChatSession:
+    """A Gemini chat kept alive across the turns of one conversation.
+
+    The chat holds the converted history, so each model call only converts
+    the messages added since the previous one. `sources` are the neutral
+    messages the chat already covers; when the engine's history stops
+    matching them (history compaction, "refresh", an error turn) the chat is
+    rebuilt from the full history.
+    """
+
+    def __init__(self, adapter: "GeminiAdapter"):
+        self.adapter = adapter
+        self.chat = None
+        self.sources = []
+        self.rebuilds = 0
+
+    def _next_message(self, messages: list):
+        """Return the one new Content to send, or None if the chat has to be rebuilt."""
+        if self.chat is None or len(messages) <= len(self.sources):
+            return None
+        if any(old is not new for old, new in zip(self.sources, messages)):
+            return None
+        tail = messages[len(self.sources):]
+        # The engine's copy of the model's last reply is already in the chat history
+        if self.sources and self.sources[-1]["role"] != "assistant" and tail[0]["role"] == "assistant":
+            self.sources.append(tail[0])
+            tail = tail[1:]
+        contents = self.adapter.to_native(tail)
+        if len(contents) != 1 or contents[0].role != "user":
+            return None
+        return contents[0]
+
+    async def send(self, messages: list, config: genai_types.GenerateContentConfig):
+        """Stream the model's reply to `messages`, appending to the chat where possible."""
+        message = self._next_message(messages)
+        if message is None:
+            history = self.adapter.to_native(messages)
+            message = history.pop()
+            self.chat = self.adapter.gemini.aio.chats.create(model=self.adapter.model, config=config, history=history)
+            self.rebuilds += 1
+        # Detach the chat while the reply streams in; it is only reused once the
+        # reply has been recorded in its history
+        chat, self.chat = self.chat, None
+        recorded = len(chat.get_history(curated=True))
+        async for chunk in await chat.send_message_stream(message.parts, config=config):
+            yield chunk
+        # The SDK leaves invalid (e.g. empty) replies out of the history it resends
+        if len(chat.get_history(curated=True)) > recorded:
+            self.chat = chat
+            self.sources = list(messages)
+
+
+class GeminiAdapter(ProviderAdapter):
+    name = "gemini"
+
+    def __init__(self, model: str = "gemini-2.0-flash", chat_session: bool = GEMINI_CHAT_SESSION,
+                 context_cache: bool = GEMINI_CONTEXT_CACHE):
+        super().__init__(model)
+        self.gemini = genai.Client(http_options=genai_types.HttpOptions(
+            base_url=GEMINI_BASE_URL,
+            timeout=int(LLM_TIMEOUT_SECONDS * 1000),
+        ))
+        # id of a conversation's first message -> its GeminiChatSession
+        self.chat_sessions = OrderedDict() if chat_session else None
+        self.context_cache = context_cache
+        self._cache = None  # (tools config, cached request config, CachedContent) for the current tools
+
+    def convert_tools(self, mcp_tools: list) -> genai_types.GenerateContentConfig:
+        """Build the Gemini request config declaring the MCP tools."""
+        function_declarations = []
+        for tool in mcp_tools:
+            # Create basic tool structure
+            function_declaration = {
+                "name": tool.name,
+                "description": tool.description,
+                "parameters": {"type": "OBJECT", "properties": {}, "required": []}
+            }
+
+            # Convert schema if available
+            schema = dict(tool.inputSchema) if tool.inputSchema else {}
+            for prop_name, prop_details in schema.get("properties", {}).items():
+                property_schema = {"type": TYPE_MAPPING.get(str(prop_details.get("type", "string")).lower(), "STRING")}
+                if "description" in prop_details:
+                    property_schema["description"] = prop_details["description"]
+                function_declaration["parameters"]["properties"][prop_name] = property_schema
+
+            # Add required properties
+            if "required" in schema:
+                function_declaration["parameters"]["required"] = schema["required"]
+
+            function_declarations.append(function_declaration)
+        if not function_declarations:
+            return genai_types.GenerateContentConfig()
+        return genai_types.GenerateContentConfig(tools=[genai_types.Tool(function_declarations=function_declarations)])
+
+    def to_native(self, messages: list) -> list:
+        contents = []
+        for message in messages:
+            if message["role"] == "tool":
+                part = genai_types.Part.from_function_response(
+                    name=message["name"],
+                    response={"error": message["content"]} if message.get("is_error") else {"result": message["content"]},
+                )
+                # Responses for one model turn all go back in a single user content
+                if contents and contents[-1].role == "user" and contents[-1].parts[0].function_response:
+                    contents[-1].parts.append(part)
+                else:
+                    contents.append(genai_types.Content(role="user", parts=[part]))
+            elif message["role"] == "assistant":
+                parts = [genai_types.Part(text=message["content"])] if message["content"] else []
+                parts += [genai_types.Part(function_call=genai_types.FunctionCall(name=call["name"], args=call["args"]))
+                          for call in message.get("tool_calls", [])]
+                if parts:
+                    contents.append(genai_types.Content(role="model", parts=parts))
+            else:
+                contents.append(genai_types.Content(role="user", parts=[genai_types.Part(text=message["content"])]))
+        return contents
+
+    def _parse_function_args(self, function_call) -> dict:
+        """Parse function arguments from Gemini function call."""
+        try:
+            if hasattr(function_call.args, "items"):
+                return dict(function_call.args.items())
+            # Fallback if it's a string
+            args_str = str(function_call.args or "")
+            return json.loads(args_str) if args_str.strip() else {}
+        except Exception as e:
+            print(f"Failed to parse function args: {e} - {type(function_call.args)}")
+            return {}
+
+    async def _cached_config(self, config: genai_types.GenerateContentConfig):
+        """Return a config referencing a context cache of the tool declarations, or None."""
+        if self._cache is not None and self._cache[0] is config:
+            return self._cache[1]
+        await self._delete_cache()
+        try:
+            cache = await self.gemini.aio.caches.create(
+                model=self.model,
+                config=genai_types.CreateCachedContentConfig(
+                    tools=config.tools,
+                    ttl=f"{GEMINI_CONTEXT_CACHE_TTL_SECONDS}s",
+                    display_name="mcp-tool-declarations",
+                ),
+            )
+            cached = genai_types.GenerateContentConfig(cached_content=cache.name)
+        except Exception as e:
+            print(f"Error creating Gemini context cache, sending tools inline: {e}")
+            cache, cached = None, None
+        # A failed attempt is remembered too, so it is not retried on every call
+        self._cache = (config, cached, cache)
+        return cached
+
+    async def _delete_cache(self):
+        if self._cache is not None and self._cache[2] is not None:
+            try:
+                await self.gemini.aio.caches.delete(name=self._cache[2].name)
+            except Exception as e:
+                print(f"Error deleting Gemini context cache: {e}")
+        self._cache = None
+
+    async def step_config(self, config: genai_types.GenerateContentConfig, allow_tools: bool) -> genai_types.GenerateContentConfig:
+        if not config or not config.tools:
+            return config
+        if not allow_tools:
+            # Cached content can't be combined with a request tool_config, so the
+            # forced final answer always sends the tools inline
+            return config.model_copy(update={"tool_config": genai_types.ToolConfig(
+                function_calling_config=genai_types.FunctionCallingConfig(mode="NONE"))})
+        if self.context_cache:
+            return await self._cached_config(config) or config
+        return config
+
+    def _chat_session(self, messages: list) -> GeminiChatSession:
+        """Find the chat for the conversation `messages` belongs to, or start one."""
+        key = id(messages[0])
+        session = self.chat_sessions.get(key)
+        if session is None or (session.sources and session.sources[0] is not messages[0]):
+            session = self.chat_sessions[key] = GeminiChatSession(self)
+            while len(self.chat_sessions) > GEMINI_CHAT_SESSIONS:
+                self.chat_sessions.popitem(last=False)
+        self.chat_sessions.move_to_end(key)
+        return session
+
+    def chat_rebuilds(self) -> int:
+        return sum(session.rebuilds for session in (self.chat_sessions or {}).values())
+
+    async def _chunks(self, messages: list, config: genai_types.GenerateContentConfig):
+        if self.chat_sessions is not None:
+            async for chunk in self._chat_session(messages).send(messages, config):
+                yield chunk
+        else:
+            async for chunk in await self.gemini.aio.models.generate_content_stream(
+                model=self.model,
+                contents=self.to_native(messages),
+                config=config,
+            ):
+                yield chunk
+
+    async def stream(self, messages: list, tools, allow_tools: bool = True):
+        text_parts = []
+        tool_calls = []
+        async for chunk in self._chunks(messages, await self.step_config(tools, allow_tools)):
+            if not chunk.candidates or not getattr(chunk.candidates[0].content, "parts", None):
+                continue
+            for part in chunk.candidates[0].content.parts:
+                if part.text:
+                    text_parts.append(part.text)
+                    yield {"type": "text", "text": part.text}
+                if part.function_call:
+                    tool_calls.append({
+                        "id": part.function_call.id or f"gemini-call-{next(_call_ids)}",
+                        "name": part.function_call.name,
+                        "args": self._parse_function_args(part.function_call)
+                    })
+
+        yield {"type": "turn_end", "text": "".join(text_parts), "tool_calls": tool_calls}
+
+    async def aclose(self):
+        await self._delete_cache()
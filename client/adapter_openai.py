@@ -0,0 +1,88 @@
+import json
+import os
+
+from openai import AsyncOpenAI
+
+from engine import ProviderAdapter
+from http_pool import shared_http_client, LLM_TIMEOUT_SECONDS
+
+
+class OpenAIAdapter(ProviderAdapter):
+    name = "openai"
+
+    def __init__(self, model: str = "gpt-4o-mini", max_tokens: int = 1000):
+        super().__init__(model)
+        self.max_tokens = max_tokens
+        self.openai = AsyncOpenAI(
+            api_key=os.environ.get("OPENAI_API_KEY"),
+            http_client=shared_http_client(),
+            timeout=LLM_TIMEOUT_SECONDS,
+        )
+
+    def convert_tools(self, mcp_tools: list) -> list:
+        return [
+            {
+                "type": "function",
+                "function": {
+                    "name": tool.name,
+                    "description": tool.description,
+                    "parameters": tool.inputSchema
+                }
+            } for tool in mcp_tools]
+
+    def to_native(self, messages: list) -> list:
+        native = []
+        for message in messages:
+            if message["role"] == "tool":
+                native.append({"role": "tool", "tool_call_id": message["tool_call_id"], "content": message["content"]})
+            elif message.get("tool_calls"):
+                native.append({
+                    "role": "assistant",
+                    "content": message["content"] or None,
+                    "tool_calls": [{
+                        "id": call["id"],
+                        "type": "function",
+                        "function": {"name": call["name"], "arguments": json.dumps(call["args"])}
+                    } for call in message["tool_calls"]]
+                })
+            else:
+                native.append({"role": message["role"], "content": message["content"]})
+        return native
+
+    async def stream(self, messages: list, tools, allow_tools: bool = True):
+        stream = await self.openai.chat.completions.create(
+            model=self.model,
+            messages=self.to_native(messages),
+            tools=tools or None,
+            tool_choice=("auto" if allow_tools else "none") if tools else None,
+            max_tokens=self.max_tokens,
+            stream=True
+        )
+
+        content = []
+        tool_calls = {}  # index -> id/name/arguments, assembled from deltas
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta
+            if delta.content:
+                content.append(delta.content)
+                yield {"type": "text", "text": delta.content}
+            for tool_call in delta.tool_calls or []:
+                entry = tool_calls.setdefault(tool_call.index, {"id": None, "name": "", "arguments": ""})
+                if tool_call.id:
+                    entry["id"] = tool_call.id
+                if tool_call.function and tool_call.function.name:
+                    entry["name"] += tool_call.function.name
+                if tool_call.function and tool_call.function.arguments:
+                    entry["arguments"] += tool_call.function.arguments
+
+        yield {
+            "type": "turn_end",
+            "text": "".join(content),
+            "tool_calls": [{
+                "id": tool_calls[index]["id"],
+                "name": tool_calls[index]["name"],
+                "args": json.loads(tool_calls[index]["arguments"] or "{}")
+            } for index in sorted(tool_calls)]
+        }
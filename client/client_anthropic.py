@@ -1,155 +1,21 @@
 import asyncio
-import sys
-import os
-import streamlit as st
-from contextlib import AsyncExitStack
 
-from mcp import ClientSession
-from mcp.client.sse import sse_client
-
-from anthropic import Anthropic
 from dotenv import load_dotenv
 
-load_dotenv()
-class MCPClient:
-    def __init__(self):
-        self.session = None
-        self.exit_stack = AsyncExitStack()
-        self.anthropic = Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
-
-    async def connect_to_sse_server(self, server_url: str):
-        """Connect to an SSE MCP server."""
-        print(f"Connecting to SSE MCP server at {server_url}")
-
-        self._streams_context = sse_client(url=server_url)
-        streams = await self._streams_context.__aenter__()
-
-        self._session_context = ClientSession(*streams)
-        self.session = await self._session_context.__aenter__()
-
-        # Initialize
-        await self.session.initialize()
-        
-        # List available tools
-        response = await self.session.list_tools()
-        tools = response.tools
-        print(f"Connected to SSE MCP Server at {server_url}. Available tools: {[tool.name for tool in tools]}")
-
-    async def connect_to_server(self, server_path_or_url: str):
-        """Connect to an MCP server (either stdio or SSE)."""
-        # Check if the input is a URL (for SSE server)
-        # url_pattern = re.compile(r'^https?://')
-        
-        # if url_pattern.match(server_path_or_url):
-        #     # It's a URL, connect to SSE server
-        #     await self.connect_to_sse_server(server_path_or_url)
-        # else:
-        #     # It's a script path, connect to stdio server
-        #     await self.connect_to_stdio_server(server_path_or_url)
-        await self.connect_to_sse_server(server_path_or_url)
-
-    async def process_query(self, query: str) -> str:
-        """Process a query using Claude and available tools"""
-        messages = [
-            {
-                "role": "user",
-                "content": query
-            }
-        ]
-
-        response = await self.session.list_tools()
-        available_tools = [{
-            "name": tool.name,
-            "description": tool.description,
-            "input_schema": tool.inputSchema
-        } for tool in response.tools]
+from engine import BaseMCPClient, run_client
+from adapter_anthropic import AnthropicAdapter
 
-        # Initial Claude API call
-        response = self.anthropic.messages.create(
-            model="claude-3-5-sonnet-20241022",
-            max_tokens=1000,
-            messages=messages,
-            tools=available_tools
-        )
-
-        # Process response and handle tool calls
-        final_text = []
-
-        assistant_message_content = []
-        for content in response.content:
-            if content.type == 'text':
-                final_text.append(content.text)
-                assistant_message_content.append(content)
-            elif content.type == 'tool_use':
-                tool_name = content.name
-                tool_args = content.input
-
-                # Execute tool call
-                result = await self.session.call_tool(tool_name, tool_args)
-                final_text.append(f"[Calling tool {tool_name} with args {tool_args}]")
-
-                assistant_message_content.append(content)
-                messages.append({
-                    "role": "assistant",
-                    "content": assistant_message_content
-                })
-                messages.append({
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "tool_result",
-                            "tool_use_id": content.id,
-                            "content": result.content
-                        }
-                    ]
-                })
-
-                # Get next response from Claude
-                response = self.anthropic.messages.create(
-                    model="claude-3-5-sonnet-20241022",
-                    max_tokens=1000,
-                    messages=messages,
-                    tools=available_tools
-                )
-
-                final_text.append(response.content[0].text)
-
-        return "\n".join(final_text)
+load_dotenv()
 
-    async def chat_loop(self):
-        """Run an interactive chat loop with the server."""
-        print("Type your queries or 'quit' to exit.")
-        
-        while True:
-            try:
-                query = input("\nQuery: ").strip()
-                if query.lower() == "quit":
-                    break
-                
-                #  Check if the user wants to refresh conversation (history)
-                response = await self.process_query(query)
-                print("\nResponse:", response)
-            except Exception as e:
-                print("Error:", str(e))
 
-    async def clenup(self):
-        """Clean up resources."""
-        await self.exit_stack.aclose()
-        if hasattr(self, '_session_context') and self._session_context:
-            await self._session_context.__aexit__(None, None, None)
-        if hasattr(self, '_streams_context') and self._streams_context:
-            await self._streams_context.__aexit__(None, None, None)
+class MCPClient(BaseMCPClient):
+    def __init__(self):
+        super().__init__(AnthropicAdapter(model="claude-3-5-sonnet-20241022"))
 
 
 async def main():
-    client = MCPClient()
-    try:
-        await client.connect_to_server("http://localhost:8000/mcp")
-        await client.chat_loop()
-    finally:
-        await client.clenup()
-        print("\nMCP Client Closed!")
+    await run_client(MCPClient(), "http://localhost:8000/mcp")
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main())
@@ -0,0 +1,332 @@
+import asyncio
+import inspect
+import time
+import uuid
+from contextlib import AsyncExitStack
+
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+from history import HistoryManager, HISTORY_SUMMARIZE
+from http_pool import close_shared_http_client
+from publisher import QueuePublisher, TOOL_ARGS_QUEUE, TOOL_ARGS_RELAY
+from recorder import recorder
+from response_cache import ResponseCache, RESPONSE_CACHE, fingerprint
+from streaming import collect_stream, render_stream, STREAM_RESPONSES, STREAM_RELAY, CHAT_STREAM_QUEUE
+from tool_cache import CACHEABLE_TOOLS
+from tool_catalog import ToolCatalog
+from tool_dispatch import ToolDispatcher, MAX_TOOL_STEPS
+from tracing import tracer
+
+# Conversation history is kept in one provider-neutral format; adapters
+# translate it to their own request shape on every model call:
+#   {"role": "user", "content": str}
+#   {"role": "assistant", "content": str, "tool_calls": [{"id", "name", "args"}]}   (tool_calls optional)
+#   {"role": "tool", "tool_call_id": str, "name": str, "content": str, "is_error": bool}
+
+
+class ProviderAdapter:
+    """Translates between the engine and one LLM provider's API.
+
+    Subclasses set `name` (also the tool catalog memo key) and implement
+    `convert_tools` and `stream`.
+    """
+
+    name = "base"
+
+    def __init__(self, model: str):
+        self.model = model
+
+    def convert_tools(self, mcp_tools: list):
+        """Build the provider's tool declarations from MCP tools (memoized by the catalog)."""
+        raise NotImplementedError
+
+    async def stream(self, messages: list, tools, allow_tools: bool = True):
+        """Send the neutral `messages` to the model and stream its reply.
+
+        Yields {"type": "text", "text": delta} events, then exactly one
+        {"type": "turn_end", "text": str, "tool_calls": [{"id", "name", "args"}]}.
+        """
+        raise NotImplementedError
+        yield
+
+    async def aclose(self):
+        pass
+
+
+class BaseMCPClient:
+    """Provider-agnostic MCP chat client.
+
+    Owns the SSE session, tool catalog, tool dispatch, publishers and the
+    model -> tools -> model loop; everything provider specific lives in the
+    adapter.
+    """
+
+    def __init__(self, adapter: ProviderAdapter, tool_hooks: dict | None = None):
+        self.adapter = adapter
+        self.session = None
+        self.exit_stack = AsyncExitStack()
+        self.tool_catalog = ToolCatalog()
+        self.tool_dispatcher = ToolDispatcher()
+        # tool name -> callable(args) or coroutine function, run after the tool call succeeded
+        self.tool_hooks = tool_hooks or {}
+        # Sent as X-Session-ID so the server's /creds_* state is per client, not the shared default
+        self.session_id = uuid.uuid4().hex
+        # Extra headers for the MCP connection, e.g. {"Authorization": "Bearer ..."}
+        self.headers: dict = {}
+        self.hook_seconds = 0.0
+        self.tool_args_publisher = QueuePublisher(TOOL_ARGS_QUEUE) if TOOL_ARGS_RELAY else None
+        self.stream_publisher = QueuePublisher(CHAT_STREAM_QUEUE) if STREAM_RELAY else None
+        self.response_cache = ResponseCache() if RESPONSE_CACHE else None
+        self.history = HistoryManager(summarize=self.summarize if HISTORY_SUMMARIZE else None)
+
+    async def connect_to_sse_server(self, server_url: str):
+        """Connect to an SSE MCP server.
+
+        Args:
+            server_url (str): URL of the SSE MCP server.
+        """
+        print(f"Connecting to SSE MCP server at {server_url}")
+
+        # Store the context managers so they stay alive
+        with tracer.span("mcp.connect", url=server_url):
+            self._streams_context = sse_client(url=server_url, headers=self.server_headers())
+            streams = await self._streams_context.__aenter__()
+
+        self._session_context = ClientSession(*streams, message_handler=self.tool_catalog.handle_message)
+        self.bind_session(await self._session_context.__aenter__())
+
+        # Initialize
+        await self.session.initialize()
+        for publisher in (self.tool_args_publisher, self.stream_publisher):
+            if publisher:
+                await publisher.start()
+
+        # List available tools
+        tools = await self.tool_catalog.refresh()
+        print(f"Connected to SSE MCP Server at {server_url}. Available tools: {[tool.name for tool in tools]}")
+
+    def server_headers(self) -> dict:
+        return {**tracer.headers(), **self.headers, "X-Session-ID": self.session_id}
+
+    def bind_session(self, session):
+        """Route the tool catalog and dispatcher through a newly opened MCP session."""
+        self.session = self.tool_catalog.session = self.tool_dispatcher.session = session
+        if self.tool_dispatcher.cache is not None:
+            self.tool_dispatcher.cache.identity = self.headers.get("Authorization")
+
+    async def connect_to_server(self, server_url: str):
+        """Connect to an MCP server (SSE only)."""
+        await self.connect_to_sse_server(server_url)
+
+    async def summarize(self, messages: list) -> str:
+        """Ask the model for a short summary of `messages` (used when compacting history)."""
+        transcript = "\n".join(f"{m['role']}: {m['content']}" for m in messages if m["content"])
+        prompt = [{"role": "user", "content": "Summarize this conversation in a few sentences, keeping names, "
+                                              "emails and decisions:\n\n" + transcript}]
+        async for event in self.adapter.stream(prompt, None, allow_tools=False):
+            if event["type"] == "turn_end":
+                return event["text"]
+
+    async def process_query(self, query: str, previous_messages: list = None,
+                            history: HistoryManager | None = None, conversation_id: str = "default") -> tuple[str, list]:
+        """Process a query using the MCP server and available tools.
+
+        Args:
+            query (str): The query to send to the model.
+            previous_messages (list, optional): Previous conversation history.
+            history (HistoryManager, optional): Budget/compaction state for this
+                conversation; defaults to the client's own.
+            conversation_id (str, optional): Groups turns in the session recording.
+
+        Returns:
+            tuple[str, list]: The response text and updated messages.
+        """
+        done = await collect_stream(self.process_query_stream(query, previous_messages, history, conversation_id))
+        return done["text"], done["messages"]
+
+    async def process_query_stream(self, query: str, previous_messages: list = None,
+                                   history: HistoryManager | None = None, conversation_id: str = "default"):
+        """Like process_query, but yields text deltas and tool events as they happen.
+
+        See streaming.py for the event shapes; the last event is "done".
+        """
+        history = history or self.history
+        if not self.session:
+            raise RuntimeError("Client session is not initialized.")
+
+        response_cache = self.response_cache
+        if response_cache:
+            # Shared by every conversation that reaches the server as the same identity (see ToolResultCache)
+            tools = await self.tool_catalog.get_tools()
+            state = fingerprint(self.adapter.model, self.headers.get("Authorization"), [tool.name for tool in tools])
+            generation = response_cache.generation
+            cached = await response_cache.lookup(query, state)
+            if cached is not None:
+                messages = list(previous_messages or []) + [{"role": "user", "content": query},
+                                                            {"role": "assistant", "content": cached}]
+                yield {"type": "text", "text": cached}
+                yield {"type": "done", "text": cached, "messages": messages, "prompt": None, "cached": True}
+                return
+        # Answers that depend on a failure or on a change the turn made aren't cached
+        cacheable = True
+        # An answer built from tool results is kept no longer than the shortest of their TTLs
+        answer_ttl = None
+
+        record = recorder.turn(conversation_id, query, self.adapter.name, self.adapter.model)
+        with tracer.span("turn", provider=self.adapter.name, model=self.adapter.model) as turn_span:
+            tools = await self.tool_catalog.converted(self.adapter.name, self.adapter.convert_tools)
+            messages = list(previous_messages) if previous_messages else []
+            messages.append({"role": "user", "content": query})
+
+            final_text = []
+            try:
+                for step in range(MAX_TOOL_STEPS + 1):
+                    # On the last step withhold tools so the model has to answer
+                    turn = None
+                    messages = await history.compact(messages)
+                    if record:
+                        record.llm_start()
+                    with tracer.span("llm", step=step, prompt_tokens=history.last_report["prompt_tokens"]) as llm_span:
+                        start = time.perf_counter()
+                        async for event in self.adapter.stream(messages, tools, allow_tools=step < MAX_TOOL_STEPS):
+                            if event["type"] == "turn_end":
+                                turn = event
+                            else:
+                                if start is not None:
+                                    llm_span.set_attribute("first_token_ms", round((time.perf_counter() - start) * 1000, 3))
+                                    start = None
+                                yield event
+                        llm_span.set_attribute("tool_calls", len(turn["tool_calls"]))
+                    if record:
+                        record.llm_done()
+
+                    if turn["text"]:
+                        final_text.append(turn["text"])
+                    assistant_message = {"role": "assistant", "content": turn["text"]}
+                    if turn["tool_calls"]:
+                        assistant_message["tool_calls"] = turn["tool_calls"]
+                    messages.append(assistant_message)
+                    if not turn["tool_calls"]:
+                        break
+
+                    # Run every tool call from this turn at once, then answer them in one follow-up
+                    for call in turn["tool_calls"]:
+                        if response_cache and call["name"] not in CACHEABLE_TOOLS:
+                            cacheable = False
+                            response_cache.invalidate()
+                        elif response_cache:
+                            tool_ttl = CACHEABLE_TOOLS[call["name"]]
+                            answer_ttl = tool_ttl if answer_ttl is None else min(answer_ttl, tool_ttl)
+                        if self.tool_args_publisher:
+                            with tracer.span("rabbitmq.enqueue", queue=TOOL_ARGS_QUEUE):
+                                self.tool_args_publisher.publish_nowait(call["args"])
+                        yield {"type": "tool_call", "name": call["name"], "args": call["args"]}
+
+                    results = await self.tool_dispatcher.run([(call["name"], call["args"]) for call in turn["tool_calls"]])
+                    if response_cache and not cacheable:
+                        # Answers stored while the change was running may predate it
+                        response_cache.invalidate()
+                    for call, result in zip(turn["tool_calls"], results):
+                        messages.append({
+                            "role": "tool",
+                            "tool_call_id": call["id"],
+                            "name": call["name"],
+                            "content": result.text,
+                            "is_error": result.is_error
+                        })
+                        cacheable = cacheable and not result.is_error
+                        if record:
+                            record.tool_done(call["name"], call["args"], result.elapsed, result.is_error, result.cached)
+                        yield {"type": "tool_result", "name": result.name, "is_error": result.is_error,
+                               "elapsed": result.elapsed, "cached": result.cached}
+
+                    # Hooks run once every call has its reply in the history; a failing hook is only
+                    # logged, since an unanswered tool call would break every later request
+                    for call, result in zip(turn["tool_calls"], results):
+                        hook = self.tool_hooks.get(call["name"])
+                        if hook and not result.is_error:
+                            with tracer.span("tool_hook", tool=call["name"]):
+                                start = time.perf_counter()
+                                try:
+                                    hook_result = hook(call["args"])
+                                    if inspect.isawaitable(hook_result):
+                                        await hook_result
+                                except Exception as e:
+                                    print(f"Error in {call['name']} tool hook: {e}")
+                                self.hook_seconds += time.perf_counter() - start
+
+            except Exception as e:
+                cacheable = False
+                turn_span.set_error(str(e))
+                if record:
+                    record.error = str(e)
+                error_msg = f"I encountered an error while processing your request: {str(e)}"
+                final_text.append(error_msg)
+                yield {"type": "text", "text": error_msg}
+
+            turn_span.set_attribute("steps", step + 1)
+        if record:
+            recorder.write(record)
+        text = "\n".join(final_text)
+        if response_cache and cacheable and text:
+            await response_cache.store(query, state, text, generation, ttl=answer_ttl)
+        yield {"type": "done", "text": text, "messages": messages, "prompt": history.last_report, "cached": False}
+
+    async def chat_loop(self):
+        """Run an interactive chat loop with the server."""
+        previous_messages = []
+        conversations = 1
+        print("Type your queries or 'quit' to exit.")
+        print("Type 'refresh' to clear conversation history.")
+
+        while True:
+            try:
+                # Read stdin off the loop so the SSE session keeps running meanwhile
+                query = (await asyncio.to_thread(input, "\nQuery: ")).strip()
+                if query.lower() == "quit":
+                    break
+
+                #  Check if the user wants to refresh conversation (history)
+                if query.lower() == "refresh":
+                    previous_messages = []
+                    conversations += 1
+                    print("Conversation history cleared.")
+                    continue
+
+                if STREAM_RESPONSES:
+                    done = await render_stream(self.process_query_stream(query, previous_messages, conversation_id=f"chat-{conversations}"),
+                                              self.stream_publisher)
+                    previous_messages = done["messages"]
+                else:
+                    response, previous_messages = await self.process_query(query, previous_messages=previous_messages,
+                                                                          conversation_id=f"chat-{conversations}")
+                    print("\nResponse:", response)
+            except Exception as e:
+                print("Error:", str(e))
+
+    async def cleanup(self):
+        """Clean up resources."""
+        print(f"Tool catalog: {self.tool_catalog.stats()}")
+        print(f"Tool calls: {self.tool_dispatcher.stats()}, hooks {self.hook_seconds * 1000:.1f}ms total")
+        if self.response_cache:
+            print(f"Response cache: {self.response_cache.stats()}")
+        for publisher in (self.tool_args_publisher, self.stream_publisher):
+            if publisher:
+                await publisher.close()
+        await self.exit_stack.aclose()
+        if hasattr(self, '_session_context') and self._session_context:
+            await self._session_context.__aexit__(None, None, None)
+        if hasattr(self, '_streams_context') and self._streams_context:
+            await self._streams_context.__aexit__(None, None, None)
+        await self.adapter.aclose()
+        await close_shared_http_client()
+
+
+async def run_client(client: BaseMCPClient, server_url: str = "http://localhost:8000/mcp"):
+    try:
+        await client.connect_to_server(server_url)
+        await client.chat_loop()
+    finally:
+        await client.cleanup()
+        print("\nMCP Client Closed!")
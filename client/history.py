@@ -0,0 +1,105 @@
+import json
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+# Approximate prompt budget for the conversation history, in tokens
+HISTORY_TOKEN_BUDGET = int(os.environ.get("HISTORY_TOKEN_BUDGET", "8000"))
+# Tool results from earlier turns longer than this are replaced by a short preview
+HISTORY_TOOL_RESULT_MAX_CHARS = int(os.environ.get("HISTORY_TOOL_RESULT_MAX_CHARS", "2000"))
+# Ask the model to summarize dropped turns instead of just dropping them
+HISTORY_SUMMARIZE = os.environ.get("HISTORY_SUMMARIZE", "0") == "1"
+SUMMARY_PREFIX = "[Summary of the earlier conversation] "
+
+
+def estimate_tokens(message: dict) -> int:
+    """Rough token count (~4 characters per token)."""
+    size = len(message.get("content") or "")
+    if message.get("tool_calls"):
+        size += len(json.dumps(message["tool_calls"]))
+    return size // 4 + 4
+
+
+class HistoryManager:
+    """Keeps the conversation history sent to the model within a token budget.
+
+    Token counts are computed once per message and cached here (the
+    messages themselves are never modified), so each turn only pays for the
+    new messages. When over budget, tool results from earlier turns are
+    elided to a short preview first (once; elided copies are marked and
+    left alone afterwards), then the oldest whole turns (a
+    user message and everything after it up to the next one) are dropped,
+    or summarized when a `summarize` coroutine is given. The turn in progress
+    is never touched.
+    """
+
+    def __init__(self, budget: int = HISTORY_TOKEN_BUDGET, max_tool_result_chars: int = HISTORY_TOOL_RESULT_MAX_CHARS,
+                 summarize=None):
+        self.budget = budget
+        self.max_tool_result_chars = max_tool_result_chars
+        self.summarize = summarize
+        # id(message) -> (message, token count); the message is held so its id can't be reused.
+        # Pruned to the compacted history after every compact()
+        self._tokens: dict = {}
+        self.last_report: dict = {}
+
+    def _count(self, message: dict) -> int:
+        cached = self._tokens.get(id(message))
+        if cached is None or cached[0] is not message:
+            cached = self._tokens[id(message)] = (message, estimate_tokens(message))
+        return cached[1]
+
+    def total_tokens(self, messages: list) -> int:
+        return sum(self._count(message) for message in messages)
+
+    def _elide(self, message: dict) -> dict:
+        preview = message["content"][:200]
+        elided = dict(message, elided=True)
+        elided["content"] = f"[{message.get('name', 'tool')} result elided ({len(message['content'])} chars)] {preview}..."
+        return elided
+
+    def _turn_starts(self, messages: list) -> list:
+        return [i for i, message in enumerate(messages)
+                if message["role"] == "user" and not str(message["content"]).startswith(SUMMARY_PREFIX)]
+
+    async def compact(self, messages: list) -> list:
+        """Return `messages` trimmed to the budget; the last turn is kept intact."""
+        turn_starts = self._turn_starts(messages)
+        current = turn_starts[-1] if turn_starts else 0
+        dropped_turns = 0
+        elided = 0
+
+        if self.total_tokens(messages) > self.budget:
+            compacted = []
+            for i, message in enumerate(messages):
+                if (i < current and message["role"] == "tool" and not message.get("elided")
+                        and len(message["content"]) > self.max_tool_result_chars):
+                    message = self._elide(message)
+                    elided += 1
+                compacted.append(message)
+            messages = compacted
+
+        if self.total_tokens(messages) > self.budget:
+            starts = self._turn_starts(messages)
+            # The history may open with an earlier summary; keep it in front
+            head = messages[:1] if messages and str(messages[0]["content"]).startswith(SUMMARY_PREFIX) else []
+            dropped = []
+            while len(starts) > 1 and self.total_tokens(head + messages[starts[0]:]) > self.budget:
+                dropped += messages[starts[0]:starts[1]]
+                starts.pop(0)
+                dropped_turns += 1
+            if dropped and self.summarize is not None:
+                summary = await self.summarize(head + dropped)
+                head = [{"role": "user", "content": SUMMARY_PREFIX + summary}]
+            messages = head + messages[starts[0]:]
+
+        prompt_tokens = self.total_tokens(messages)
+        self._tokens = {id(message): self._tokens[id(message)] for message in messages}
+        self.last_report = {
+            "prompt_tokens": prompt_tokens,
+            "messages": len(messages),
+            "dropped_turns": dropped_turns,
+            "elided_results": elided,
+        }
+        return messages
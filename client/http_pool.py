@@ -0,0 +1,33 @@
+import os
+
+import httpx
+from dotenv import load_dotenv
+
+load_dotenv()
+LLM_TIMEOUT_SECONDS = float(os.environ.get("LLM_TIMEOUT_SECONDS", "60"))
+LLM_MAX_CONNECTIONS = int(os.environ.get("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+# Point the Gemini client at another server (e.g. the fake provider); OpenAI and
+# Anthropic read OPENAI_BASE_URL / ANTHROPIC_BASE_URL themselves.
+GEMINI_BASE_URL = os.environ.get("GEMINI_BASE_URL")
+
+_http_client: httpx.AsyncClient | None = None
+
+
+def shared_http_client() -> httpx.AsyncClient:
+    """One keep-alive connection pool shared by every provider SDK client in the process."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(LLM_TIMEOUT_SECONDS, connect=10.0),
+            limits=httpx.Limits(max_connections=LLM_MAX_CONNECTIONS,
+                                max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS),
+        )
+    return _http_client
+
+
+async def close_shared_http_client():
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
@@ -0,0 +1,280 @@
+import asyncio
+import itertools
+import os
+import time
+from contextlib import AsyncExitStack
+
+from dotenv import load_dotenv
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+from engine import BaseMCPClient, ProviderAdapter
+from history import HistoryManager, HISTORY_SUMMARIZE
+from http_pool import close_shared_http_client
+from publisher import QueuePublisher, TOOL_ARGS_QUEUE, TOOL_ARGS_RELAY
+from response_cache import ResponseCache, RESPONSE_CACHE
+from streaming import collect_stream, STREAM_RELAY, CHAT_STREAM_QUEUE
+from tracing import tracer
+
+load_dotenv()
+MCP_POOL_SIZE = int(os.environ.get("MCP_POOL_SIZE", "4"))
+# Turns one SSE session carries at once (MCP multiplexes requests over a session)
+MCP_POOL_MAX_INFLIGHT = int(os.environ.get("MCP_POOL_MAX_INFLIGHT", "16"))
+MCP_POOL_CONNECT_TIMEOUT_SECONDS = float(os.environ.get("MCP_POOL_CONNECT_TIMEOUT_SECONDS", "10"))
+MCP_POOL_HEALTH_INTERVAL_SECONDS = float(os.environ.get("MCP_POOL_HEALTH_INTERVAL_SECONDS", "15"))
+# A session that doesn't answer a ping within this long is reconnected
+MCP_POOL_PING_TIMEOUT_SECONDS = float(os.environ.get("MCP_POOL_PING_TIMEOUT_SECONDS", "5"))
+MCP_POOL_MAX_BACKOFF_SECONDS = float(os.environ.get("MCP_POOL_MAX_BACKOFF_SECONDS", "30"))
+# Conversations idle for longer than this are dropped
+MCP_POOL_CONVERSATION_TTL_SECONDS = float(os.environ.get("MCP_POOL_CONVERSATION_TTL_SECONDS", "3600"))
+
+
+class Conversation:
+    """State of one logical chat; never shared between conversations."""
+
+    def __init__(self, conversation_id: str, history: HistoryManager):
+        self.id = conversation_id
+        self.messages = []
+        self.history = history
+        # One turn at a time per conversation; later turns queue here
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+        self.turns = 0
+
+
+class PooledSession:
+    """One SSE connection and MCP session, owned by its own task.
+
+    The SSE client and ClientSession are entered and exited inside `_run`,
+    since anyio requires their scopes to close in the task that opened them.
+    `client` runs the engine loop over the session; it is shared by every
+    conversation routed here, all per-conversation state is passed in.
+    """
+
+    def __init__(self, index: int, server_url: str, client: BaseMCPClient):
+        self.index = index
+        self.server_url = server_url
+        self.client = client
+        self.inflight = 0
+        self.healthy = False
+        self.connects = 0
+        self.failures = 0
+        self._task = None
+        self._closing = None
+
+    async def connect(self, timeout: float = MCP_POOL_CONNECT_TIMEOUT_SECONDS):
+        await self.close()
+        self._closing = asyncio.Event()
+        ready = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._run(ready))
+        try:
+            await asyncio.wait_for(asyncio.shield(ready), timeout)
+        except BaseException:
+            await self.close()
+            raise
+        self.connects += 1
+
+    async def _run(self, ready: asyncio.Future):
+        try:
+            async with AsyncExitStack() as stack:
+                with tracer.span("mcp.connect", url=self.server_url, pool_session=self.index):
+                    streams = await stack.enter_async_context(sse_client(url=self.server_url, headers=self.client.server_headers()))
+                    session = await stack.enter_async_context(
+                        ClientSession(*streams, message_handler=self.client.tool_catalog.handle_message))
+                    await session.initialize()
+                    self.client.bind_session(session)
+                    await self.client.tool_catalog.refresh()
+                self.healthy = True
+                ready.set_result(None)
+                await self._closing.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                print(f"Error in MCP session {self.index}: {e}")
+        finally:
+            self.healthy = False
+            self.client.session = None
+
+    async def ping(self, timeout: float) -> bool:
+        if not self.healthy or self.client.session is None:
+            return False
+        try:
+            await asyncio.wait_for(self.client.session.send_ping(), timeout)
+            return True
+        except Exception as e:
+            print(f"Error pinging MCP session {self.index}: {e}")
+            return False
+
+    async def close(self):
+        self.healthy = False
+        if self._task is not None:
+            self._closing.set()
+            try:
+                await self._task
+            except BaseException as e:
+                print(f"Error closing MCP session {self.index}: {e}")
+            self._task = None
+
+
+class MCPClientPool:
+    """Serves many concurrent conversations over a bounded set of MCP sessions.
+
+    `chat`/`chat_stream` take a conversation id instead of reading stdin.
+    Each conversation keeps its own messages and history budget. Turns of one
+    conversation run in order, and each conversation holds at most one
+    capacity slot at a time, so a busy user can't starve the others: waiting
+    conversations are served first come, first served. A turn goes to the
+    healthy session with the fewest turns in flight. A background task pings
+    every session and reconnects dead ones with exponential backoff.
+    """
+
+    def __init__(self, adapter: ProviderAdapter, server_url: str = "http://localhost:8000/mcp",
+                 size: int = MCP_POOL_SIZE, max_inflight: int = MCP_POOL_MAX_INFLIGHT,
+                 health_interval: float = MCP_POOL_HEALTH_INTERVAL_SECONDS,
+                 ping_timeout: float = MCP_POOL_PING_TIMEOUT_SECONDS,
+                 conversation_ttl: float = MCP_POOL_CONVERSATION_TTL_SECONDS, tool_hooks: dict | None = None,
+                 response_cache: ResponseCache | None = None):
+        self.adapter = adapter
+        self.server_url = server_url
+        self.health_interval = health_interval
+        self.ping_timeout = min(ping_timeout, health_interval)
+        self.conversation_ttl = conversation_ttl
+        self.conversations: dict[str, Conversation] = {}
+        self._capacity = asyncio.Semaphore(size * max_inflight)
+        self._session_available = asyncio.Event()
+        self._health_task = None
+        self._reconnecting: dict[int, asyncio.Task] = {}
+        self._conversation_ids = itertools.count(1)
+        # Publishers and the response cache are shared by every session instead of one per connection
+        self.tool_args_publisher = QueuePublisher(TOOL_ARGS_QUEUE) if TOOL_ARGS_RELAY else None
+        self.stream_publisher = QueuePublisher(CHAT_STREAM_QUEUE) if STREAM_RELAY else None
+        self.response_cache = response_cache or (ResponseCache() if RESPONSE_CACHE else None)
+        self.sessions = []
+        for index in range(size):
+            client = BaseMCPClient(adapter, tool_hooks)
+            client.tool_args_publisher = self.tool_args_publisher
+            client.stream_publisher = self.stream_publisher
+            client.response_cache = self.response_cache
+            self.sessions.append(PooledSession(index, server_url, client))
+
+    async def start(self):
+        """Open every session (at least one must connect) and start health checks."""
+        for publisher in (self.tool_args_publisher, self.stream_publisher):
+            if publisher:
+                await publisher.start()
+        results = await asyncio.gather(*(session.connect() for session in self.sessions), return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if len(errors) == len(self.sessions):
+            raise RuntimeError(f"Could not connect to MCP server at {self.server_url}: {errors[0]}")
+        for session, result in zip(self.sessions, results):
+            if isinstance(result, BaseException):
+                session.failures += 1
+                print(f"Error connecting MCP session {session.index}: {result}")
+        self._session_available.set()
+        self._health_task = asyncio.create_task(self._health_loop())
+        print(f"MCP client pool connected to {self.server_url}: "
+              f"{sum(session.healthy for session in self.sessions)}/{len(self.sessions)} sessions")
+
+    def conversation(self, conversation_id: str | None = None) -> Conversation:
+        """Return the conversation with this id, creating it (or a new id) if needed."""
+        conversation_id = conversation_id or f"conversation-{next(self._conversation_ids)}"
+        conversation = self.conversations.get(conversation_id)
+        if conversation is None:
+            summarize = self.sessions[0].client.summarize if HISTORY_SUMMARIZE else None
+            conversation = self.conversations[conversation_id] = Conversation(conversation_id, HistoryManager(summarize=summarize))
+        return conversation
+
+    def reset(self, conversation_id: str):
+        """Clear a conversation's history (the pool equivalent of chat_loop's "refresh")."""
+        self.conversations.pop(conversation_id, None)
+
+    async def _acquire_session(self) -> PooledSession:
+        while True:
+            healthy = [session for session in self.sessions if session.healthy]
+            if healthy:
+                session = min(healthy, key=lambda s: s.inflight)
+                session.inflight += 1
+                return session
+            self._session_available.clear()
+            await self._session_available.wait()
+
+    async def chat_stream(self, conversation_id: str, query: str):
+        """Run one turn of a conversation, yielding the engine's stream events."""
+        conversation = self.conversation(conversation_id)
+        async with conversation.lock:
+            async with self._capacity:
+                session = await asyncio.wait_for(self._acquire_session(), MCP_POOL_CONNECT_TIMEOUT_SECONDS)
+                try:
+                    async for event in session.client.process_query_stream(
+                            query, conversation.messages, conversation.history, conversation.id):
+                        if event["type"] == "done":
+                            conversation.messages = event["messages"]
+                            conversation.turns += 1
+                        if self.stream_publisher:
+                            self.stream_publisher.publish_nowait(
+                                {"conversation_id": conversation.id, **{k: v for k, v in event.items() if k != "messages"}})
+                        yield event
+                finally:
+                    session.inflight -= 1
+                    conversation.last_used = time.monotonic()
+
+    async def chat(self, conversation_id: str, query: str) -> str:
+        """Run one turn of a conversation and return the reply text."""
+        done = await collect_stream(self.chat_stream(conversation_id, query))
+        return done["text"]
+
+    async def _reconnect(self, session: PooledSession):
+        backoff = 1.0
+        while True:
+            try:
+                await session.connect()
+                print(f"MCP session {session.index} reconnected")
+                self._session_available.set()
+                return
+            except Exception as e:
+                session.failures += 1
+                print(f"Error reconnecting MCP session {session.index}: {e}; retrying in {backoff:.0f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, MCP_POOL_MAX_BACKOFF_SECONDS)
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            # Pinged all at once, so one hung session doesn't hold up the checks of the others
+            idle = [session for session in self.sessions
+                    if session.index not in self._reconnecting or self._reconnecting[session.index].done()]
+            alive = await asyncio.gather(*(session.ping(timeout=self.ping_timeout) for session in idle))
+            for session, ok in zip(idle, alive):
+                if not ok:
+                    self._reconnecting[session.index] = asyncio.create_task(self._reconnect(session))
+
+            now = time.monotonic()
+            for conversation_id, conversation in list(self.conversations.items()):
+                if now - conversation.last_used > self.conversation_ttl and not conversation.lock.locked():
+                    del self.conversations[conversation_id]
+
+    def stats(self) -> dict:
+        return {
+            "conversations": len(self.conversations),
+            "response_cache": self.response_cache.stats() if self.response_cache else None,
+            "sessions": [{
+                "healthy": session.healthy,
+                "inflight": session.inflight,
+                "connects": session.connects,
+                "failures": session.failures,
+                "tool_calls": session.client.tool_dispatcher.stats(),
+            } for session in self.sessions],
+        }
+
+    async def close(self):
+        tasks = [task for task in [self._health_task, *self._reconnecting.values()] if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.gather(*(session.close() for session in self.sessions))
+        for publisher in (self.tool_args_publisher, self.stream_publisher):
+            if publisher:
+                await publisher.close()
+        await self.adapter.aclose()
+        await close_shared_http_client()
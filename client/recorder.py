@@ -0,0 +1,83 @@
+import json
+import os
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+# Append one JSON line per turn to this file; unset disables recording.
+# benchmarks/replay.py replays such a file against the server and fake provider.
+SESSION_RECORD_FILE = os.environ.get("SESSION_RECORD_FILE")
+# Tool arguments never written to a recording (compared case-insensitively)
+SECRET_ARGS = {"password", "re_password", "access_token", "authorization"}
+REDACTED = "[redacted]"
+
+# Each line describes one process_query turn:
+#   {"conversation": str, "start": unix seconds, "query": str, "provider": str, "model": str,
+#    "duration_ms": float, "error": str | None,
+#    "steps": [{"llm_ms": float, "tool_calls": [{"name", "args", "elapsed_ms", "is_error", "cached"}]}]}
+# Credential arguments (SECRET_ARGS) are recorded as REDACTED, so recordings can be shared.
+
+
+def redact(args):
+    """`args` with the value of every SECRET_ARGS key, at any depth, replaced by REDACTED."""
+    if isinstance(args, dict):
+        return {key: REDACTED if key.lower() in SECRET_ARGS else redact(value) for key, value in args.items()}
+    if isinstance(args, list):
+        return [redact(value) for value in args]
+    return args
+
+
+class TurnRecord:
+    """Collects one turn's model steps and tool calls as the engine runs it."""
+
+    def __init__(self, conversation: str, query: str, provider: str, model: str):
+        self.conversation = conversation
+        self.query = query
+        self.provider = provider
+        self.model = model
+        self.start = time.time()
+        self._start = time.perf_counter()
+        self._step_start = None
+        self.steps = []
+        self.error = None
+
+    def llm_start(self):
+        self._step_start = time.perf_counter()
+
+    def llm_done(self):
+        self.steps.append({"llm_ms": round((time.perf_counter() - self._step_start) * 1000, 3), "tool_calls": []})
+
+    def tool_done(self, name: str, args: dict, elapsed: float, is_error: bool, cached: bool = False):
+        self.steps[-1]["tool_calls"].append(
+            {"name": name, "args": redact(args), "elapsed_ms": round(elapsed * 1000, 3), "is_error": is_error, "cached": cached})
+
+    def to_dict(self) -> dict:
+        return {
+            "conversation": self.conversation,
+            "start": self.start,
+            "query": self.query,
+            "provider": self.provider,
+            "model": self.model,
+            "duration_ms": round((time.perf_counter() - self._start) * 1000, 3),
+            "error": self.error,
+            "steps": self.steps,
+        }
+
+
+class SessionRecorder:
+    def __init__(self, path: str | None = SESSION_RECORD_FILE):
+        self.file = open(path, "a", buffering=1, encoding="utf-8") if path else None
+
+    @property
+    def enabled(self) -> bool:
+        return self.file is not None
+
+    def turn(self, conversation: str, query: str, provider: str, model: str) -> TurnRecord | None:
+        return TurnRecord(conversation, query, provider, model) if self.file else None
+
+    def write(self, record: TurnRecord):
+        self.file.write(json.dumps(record.to_dict(), default=str) + "\n")
+
+
+recorder = SessionRecorder()
@@ -0,0 +1,158 @@
+import hashlib
+import inspect
+import json
+import math
+import os
+import re
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+# Answer a repeated query in the same conversation state without calling the model (RESPONSE_CACHE=1 to turn on)
+RESPONSE_CACHE = os.environ.get("RESPONSE_CACHE", "0") == "1"
+RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+RESPONSE_CACHE_TTL_SECONDS = float(os.environ.get("RESPONSE_CACHE_TTL_SECONDS", "300"))
+# Cosine similarity a query needs to reuse another query's answer (only with an `embed` function)
+RESPONSE_CACHE_SIMILARITY = float(os.environ.get("RESPONSE_CACHE_SIMILARITY", "0.92"))
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Case, punctuation and spacing folded, so "Who am I?" and "who am i" match."""
+    return _WHITESPACE.sub(" ", _PUNCTUATION.sub(" ", query.lower())).strip()
+
+
+def fingerprint(model: str, identity: str | None, tool_names) -> str:
+    """Hash of what a cached answer depends on besides the query.
+
+    That is the model, who the server sees the caller as (the MCP
+    connection's Authorization header, None without one) and which tools the
+    model could call. The conversation so far is deliberately left out: it
+    grows every turn, so a repeated question would never match again.
+    """
+    payload = json.dumps([model, identity, sorted(tool_names)], separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _unit(vector) -> list:
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+class ResponseCache:
+    """Final answers of earlier turns, keyed by normalized query and state (see fingerprint).
+
+    The exact tier matches the normalized query text. With an `embed`
+    function (text -> vector, sync or async) a miss falls back to the most
+    similar cached query asked in the same state, if its cosine
+    similarity reaches `similarity`. Those vectors live in a small in-memory
+    index per fingerprint, scanned linearly (the cache is
+    bounded). Entries expire after `ttl` seconds, or sooner when the answer
+    was built from tool results that expire sooner, are evicted least
+    recently used first, and everything is dropped whenever a mutating tool
+    runs.
+    """
+
+    def __init__(self, maxsize: int = RESPONSE_CACHE_MAX_ENTRIES, ttl: float = RESPONSE_CACHE_TTL_SECONDS,
+                 embed=None, similarity: float = RESPONSE_CACHE_SIMILARITY):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.embed = embed
+        self.similarity = similarity
+        # (fingerprint, normalized query) -> (expires_at, text)
+        self._data: OrderedDict = OrderedDict()
+        # fingerprint -> {normalized query: unit vector}
+        self._vectors: dict = {}
+        # Bumped by invalidate; answers computed across a bump aren't stored
+        self.generation = 0
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.invalidations = 0
+
+    async def _embed(self, text: str) -> list:
+        vector = self.embed(text)
+        if inspect.isawaitable(vector):
+            vector = await vector
+        return _unit(vector)
+
+    def _get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, text = entry
+        if expires_at <= time.monotonic():
+            self._remove(key)
+            return None
+        self._data.move_to_end(key)
+        return text
+
+    def _remove(self, key):
+        self._data.pop(key, None)
+        vectors = self._vectors.get(key[0])
+        if vectors is not None:
+            vectors.pop(key[1], None)
+            if not vectors:
+                del self._vectors[key[0]]
+
+    async def lookup(self, query: str, state: str) -> str | None:
+        """The cached answer to `query` asked in `state` (see fingerprint), or None."""
+        normalized = normalize_query(query)
+        text = self._get((state, normalized))
+        if text is not None:
+            self.hits += 1
+            return text
+        if self.embed is not None and self._vectors.get(state):
+            vector = await self._embed(normalized)
+            best, best_score = None, self.similarity
+            for candidate, candidate_vector in self._vectors[state].items():
+                score = sum(a * b for a, b in zip(vector, candidate_vector))
+                if score >= best_score:
+                    best, best_score = candidate, score
+            if best is not None:
+                text = self._get((state, best))
+                if text is not None:
+                    self.similar_hits += 1
+                    return text
+        self.misses += 1
+        return None
+
+    async def store(self, query: str, state: str, text: str, generation: int, ttl: float | None = None):
+        """Cache `text` as the answer, unless something was invalidated since `generation` was read.
+
+        `ttl` shortens the cache's own TTL for this entry (never lengthens it).
+        """
+        key = (state, normalize_query(query))
+        vector = await self._embed(key[1]) if self.embed is not None else None
+        if generation != self.generation:
+            return
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else min(self.ttl, ttl)), text)
+        self._data.move_to_end(key)
+        if vector is not None:
+            self._vectors.setdefault(key[0], {})[key[1]] = vector
+        while len(self._data) > self.maxsize:
+            self._remove(next(iter(self._data)))
+        self.stores += 1
+
+    def invalidate(self):
+        self.generation += 1
+        self._data.clear()
+        self._vectors.clear()
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.similar_hits + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "similar_hits": self.similar_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.similar_hits) / lookups, 3) if lookups else 0.0,
+            "stores": self.stores,
+            "invalidations": self.invalidations,
+        }
@@ -0,0 +1,55 @@
+import os
+
+from dotenv import load_dotenv
+
+load_dotenv()
+# chat_loop prints deltas as they arrive unless STREAM_RESPONSES=0
+STREAM_RESPONSES = os.environ.get("STREAM_RESPONSES", "1") != "0"
+# Also publish every stream event to RabbitMQ for the server's /ws/chat_stream
+STREAM_RELAY = os.environ.get("STREAM_RELAY", "0") == "1"
+CHAT_STREAM_QUEUE = "chat_stream"
+
+# process_query_stream yields dict events:
+#   {"type": "text", "text": <delta>}
+#   {"type": "tool_call", "name": ..., "args": {...}}
+#   {"type": "tool_result", "name": ..., "is_error": bool, "elapsed": seconds, "cached": bool}
+#   {"type": "done", "text": <full response>, "messages": [...], "prompt": {...}, "cached": bool}   (always last)
+# "prompt" is the history manager's report for the last model call of the turn
+# (None when "cached": the answer came from the response cache, with no model call).
+
+
+async def collect_stream(events) -> dict:
+    """Drain a process_query_stream generator and return its final "done" event."""
+    done = None
+    async for event in events:
+        if event["type"] == "done":
+            done = event
+    return done
+
+
+async def render_stream(events, publisher=None) -> dict:
+    """Print a process_query_stream generator to the terminal as it arrives.
+
+    Each event (minus the message history) is also handed to `publisher`
+    when one is given. Returns the final "done" event.
+    """
+    done = None
+    print("\nResponse: ", end="", flush=True)
+    async for event in events:
+        if event["type"] == "text":
+            print(event["text"], end="", flush=True)
+        elif event["type"] == "tool_call":
+            print(f"\n[Calling tool {event['name']} with args {event['args']}]", flush=True)
+        elif event["type"] == "tool_result":
+            status = "failed" if event["is_error"] else "cached" if event["cached"] else "done"
+            print(f"[Tool {event['name']} {status} in {event['elapsed'] * 1000:.0f}ms]", flush=True)
+        elif event["type"] == "done":
+            done = event
+            print()
+            if event["cached"]:
+                print("[Answered from the response cache]")
+            elif event.get("prompt"):
+                print(f"[Prompt ~{event['prompt']['prompt_tokens']} tokens, {event['prompt']['messages']} messages]")
+        if publisher is not None:
+            publisher.publish_nowait({k: v for k, v in event.items() if k != "messages"})
+    return done
@@ -0,0 +1,165 @@
+import asyncio
+import copy
+import json
+import os
+import time
+from collections import OrderedDict
+
+from dotenv import load_dotenv
+
+load_dotenv()
+# Reuse results of read-only tools instead of calling the server again (TOOL_CACHE=1 to turn on)
+TOOL_CACHE = os.environ.get("TOOL_CACHE", "0") == "1"
+TOOL_CACHE_MAX_ENTRIES = int(os.environ.get("TOOL_CACHE_MAX_ENTRIES", "1024"))
+
+# Read-only tools and how long (seconds) their results may be reused. Tools
+# missing here are never cached.
+CACHEABLE_TOOLS = {
+    "get_current_user": 60.0,
+    "get_users": 15.0,
+    "list_projects": 15.0,
+}
+# Tools that change server state, and the cached tools whose results they
+# make stale. Calling any tool that is in neither table clears the whole cache.
+MUTATING_TOOLS = {
+    "signup": ("get_users",),
+    "create_project": ("list_projects",),
+    "clear_users": ("get_current_user", "get_users", "list_projects"),
+    # Only issues a token; the session keeps acting as its Authorization header says
+    "login": (),
+}
+
+# Result a cancelled leader hands its followers, telling them to fetch for themselves
+_LEADER_CANCELLED = object()
+
+
+class ToolResultCache:
+    """Results of read-only MCP tools, keyed by (tool, canonical args, identity).
+
+    The identity is the Authorization header of the MCP connection (set by
+    the client when it connects): fastapi-mcp forwards only that header, so
+    it is all the server identifies a tool call by, whichever conversation
+    made it. Results fetched as one user are never served to another. Entries
+    expire after the tool's TTL and are dropped when a tool that mutates
+    their data runs; a read still in flight while a mutation starts is not
+    stored. Identical calls in flight at the same time share one round trip.
+    Only touched from the event loop, so no locking is needed.
+    """
+
+    def __init__(self, ttls: dict | None = None, invalidates: dict | None = None,
+                 maxsize: int = TOOL_CACHE_MAX_ENTRIES):
+        self.ttls = CACHEABLE_TOOLS if ttls is None else ttls
+        self.invalidates = MUTATING_TOOLS if invalidates is None else invalidates
+        self.maxsize = maxsize
+        self.identity = None
+        self._data: OrderedDict = OrderedDict()
+        self._inflight: dict = {}
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+
+    def key(self, name: str, args: dict) -> tuple:
+        return name, json.dumps(args, sort_keys=True, separators=(",", ":"), default=str), self.identity
+
+    def _get(self, key):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return result
+
+    def _set(self, key, result):
+        self._data[key] = (time.monotonic() + self.ttls[key[0]], result)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def invalidate(self, tools=None):
+        """Drop cached results of `tools` (all of them if None)."""
+        self._generation += 1
+        self.invalidations += 1
+        if tools is None:
+            self._data.clear()
+            return
+        for key in [key for key in self._data if key[0] in tools]:
+            del self._data[key]
+
+    async def call(self, name: str, args: dict, fetch):
+        """Return `await fetch()`, or a result cached for the same call.
+
+        `fetch` returns a ToolResult; error results are never cached. Reused
+        results are copies with `cached` set.
+        """
+        if name not in self.ttls:
+            return await self._call_uncached(name, args, fetch)
+
+        key = self.key(name, args)
+        while True:
+            cached = self._get(key)
+            if cached is not None:
+                self.hits += 1
+                return self._reused(cached)
+            inflight = self._inflight.get(key)
+            if inflight is None:
+                break
+            result = await asyncio.shield(inflight)
+            if result is not _LEADER_CANCELLED:
+                self.coalesced += 1
+                return self._reused(result)
+
+        self.misses += 1
+        generation = self._generation
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result = await fetch()
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise it; don't warn about this copy going unretrieved
+            future.exception()
+            raise
+        except BaseException:
+            # Cancelled: its followers weren't, so wake them to retry the call themselves
+            future.set_result(_LEADER_CANCELLED)
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        future.set_result(result)
+        if not result.is_error and generation == self._generation:
+            self._set(key, result)
+        return result
+
+    @staticmethod
+    def _reused(result):
+        result = copy.copy(result)
+        result.cached = True
+        return result
+
+    async def _call_uncached(self, name: str, args: dict, fetch):
+        tools = self.invalidates.get(name)
+        # Reads in flight from here on may see either state, so they aren't stored
+        self._generation += 1
+        try:
+            result = await fetch()
+        finally:
+            # Even a failed call may have changed something
+            if tools is None or tools:
+                self.invalidate(tools)
+        return result
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.coalesced + self.misses
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+            "invalidations": self.invalidations,
+        }
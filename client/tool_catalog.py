@@ -0,0 +1,69 @@
+import os
+import time
+
+from mcp import types
+from dotenv import load_dotenv
+
+from tracing import tracer
+
+load_dotenv()
+TOOL_CATALOG_TTL_SECONDS = float(os.environ.get("TOOL_CATALOG_TTL_SECONDS", "300"))
+
+
+class ToolCatalog:
+    """Caches the MCP server's tool list between turns.
+
+    The list is fetched on connect and refetched only after a
+    `notifications/tools/list_changed` from the server or when the TTL runs
+    out. Provider-specific schemas built from it are memoized per catalog
+    version, so a turn with a warm catalog costs no `list_tools` round trip
+    and no schema conversion.
+    """
+
+    def __init__(self, session=None, ttl: float = TOOL_CATALOG_TTL_SECONDS):
+        self.session = session
+        self.ttl = ttl
+        self.tools = None
+        self.version = 0
+        self.fetched_at = 0.0
+        self.stale = True
+        self._converted: dict = {}
+        self.list_tools_calls = 0
+        self.round_trips_saved = 0
+
+    async def refresh(self) -> list:
+        with tracer.span("mcp.list_tools") as span:
+            response = await self.session.list_tools()
+            span.set_attribute("tools", len(response.tools))
+        self.tools = response.tools
+        self.version += 1
+        self.fetched_at = time.monotonic()
+        self.stale = False
+        self._converted.clear()
+        self.list_tools_calls += 1
+        return self.tools
+
+    def invalidate(self):
+        self.stale = True
+
+    async def handle_message(self, message):
+        """`message_handler` for ClientSession; invalidates on tools/list_changed."""
+        if isinstance(message, types.ServerNotification) and isinstance(message.root, types.ToolListChangedNotification):
+            self.invalidate()
+
+    async def get_tools(self) -> list:
+        if self.stale or self.tools is None or time.monotonic() - self.fetched_at > self.ttl:
+            return await self.refresh()
+        self.round_trips_saved += 1
+        return self.tools
+
+    async def converted(self, key: str, convert):
+        """Return `convert(tools)`, computed once per catalog version under `key`."""
+        tools = await self.get_tools()
+        if key not in self._converted:
+            self._converted[key] = convert(tools)
+        return self._converted[key]
+
+    def stats(self) -> dict:
+        return {"version": self.version, "list_tools_calls": self.list_tools_calls,
+                "round_trips_saved": self.round_trips_saved}
@@ -0,0 +1,111 @@
+import asyncio
+import os
+import time
+
+from dotenv import load_dotenv
+from mcp import types
+
+from tool_cache import ToolResultCache, TOOL_CACHE
+from tracing import tracer
+
+load_dotenv()
+TOOL_CONCURRENCY = int(os.environ.get("TOOL_CONCURRENCY", "4"))
+TOOL_TIMEOUT_SECONDS = float(os.environ.get("TOOL_TIMEOUT_SECONDS", "30"))
+# Model -> tools -> model rounds allowed in one turn before tools are withheld
+MAX_TOOL_STEPS = int(os.environ.get("MAX_TOOL_STEPS", "5"))
+
+
+class ToolResult:
+    def __init__(self, name: str, args: dict, content=None, error: str | None = None):
+        self.name = name
+        self.args = args
+        self.content = content or []
+        self.error = error
+        self.elapsed = 0.0  # seconds from dispatch to result, including the semaphore wait
+        self.cached = False  # served by the ToolResultCache instead of the server
+
+    @property
+    def is_error(self) -> bool:
+        return self.error is not None
+
+    @property
+    def text(self) -> str:
+        """Tool output flattened to a string, as the provider APIs expect."""
+        if self.error is not None:
+            return self.error
+        return "\n".join(getattr(item, "text", str(item)) for item in self.content)
+
+
+class ToolDispatcher:
+    """Runs the tool calls from one model turn concurrently over the MCP session.
+
+    At most `concurrency` calls are in flight at once and each is cut off
+    after `timeout` seconds; failures come back as error results rather than
+    exceptions so the other calls' results still reach the model. With a
+    `cache`, repeated read-only calls are answered without a round trip.
+    """
+
+    def __init__(self, session=None, concurrency: int = TOOL_CONCURRENCY, timeout: float = TOOL_TIMEOUT_SECONDS,
+                 cache: ToolResultCache | None = None):
+        self.session = session
+        self.timeout = timeout
+        self.cache = cache if cache is not None else (ToolResultCache() if TOOL_CACHE else None)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self.calls = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    async def _timed_call(self, name: str, args: dict) -> ToolResult:
+        start = time.perf_counter()
+        if self.cache is None:
+            result = await self._call(name, args)
+        else:
+            result = await self.cache.call(name, args, lambda: self._call(name, args))
+        result.elapsed = time.perf_counter() - start
+        self.calls += 1
+        self.total_seconds += result.elapsed
+        self.max_seconds = max(self.max_seconds, result.elapsed)
+        return result
+
+    async def _call_tool(self, name: str, args: dict, traceparent: str | None):
+        if traceparent is None or not hasattr(self.session, "send_request"):
+            return await self.session.call_tool(name, args)
+        # Same request as session.call_tool, plus the trace context in _meta
+        request = types.ClientRequest(types.CallToolRequest(
+            method="tools/call",
+            params=types.CallToolRequestParams(name=name, arguments=args, _meta={"traceparent": traceparent}),
+        ))
+        return await self.session.send_request(request, types.CallToolResult)
+
+    async def _call(self, name: str, args: dict) -> ToolResult:
+        with tracer.span("mcp.call_tool", tool=name) as span:
+            result = await self._call_traced(name, args, span.traceparent)
+            if result.is_error:
+                span.set_error(result.error)
+            return result
+
+    async def _call_traced(self, name: str, args: dict, traceparent: str | None) -> ToolResult:
+        async with self._semaphore:
+            try:
+                result = await asyncio.wait_for(self._call_tool(name, args, traceparent), self.timeout)
+            except asyncio.TimeoutError:
+                return ToolResult(name, args, error=f"Error executing tool {name}: timed out after {self.timeout}s")
+            except Exception as e:
+                return ToolResult(name, args, error=f"Error executing tool {name}: {str(e)}")
+        if getattr(result, "isError", False):
+            return ToolResult(name, args, error="\n".join(getattr(item, "text", str(item)) for item in result.content))
+        return ToolResult(name, args, content=result.content)
+
+    async def run(self, calls: list[tuple[str, dict]]) -> list[ToolResult]:
+        """Execute `(name, args)` calls concurrently; results keep the input order."""
+        return await asyncio.gather(*(self._timed_call(name, args) for name, args in calls))
+
+    def stats(self) -> dict:
+        stats = {
+            "calls": self.calls,
+            "avg_ms": round(self.total_seconds / self.calls * 1000, 1) if self.calls else 0.0,
+            "max_ms": round(self.max_seconds * 1000, 1),
+        }
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
@@ -0,0 +1,147 @@
+import contextvars
+import json
+import os
+import secrets
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+load_dotenv()
+# "none" (default, no-op), "file" (JSON lines in TRACE_FILE) or "console"
+TRACE_EXPORTER = os.environ.get("TRACE_EXPORTER", "none")
+TRACE_FILE = os.environ.get("TRACE_FILE", str(Path(__file__).resolve().parent / "mcp_client.log"))
+TRACE_SERVICE_NAME = os.environ.get("TRACE_SERVICE_NAME", "mcp-client")
+
+# Spans are written one JSON object per line, with the fields of the OTLP span
+# model (ids as lowercase hex, times in unix nanoseconds):
+#   {"service", "name", "trace_id", "span_id", "parent_span_id", "start_time_unix_nano",
+#    "end_time_unix_nano", "duration_ms", "status": "OK" | "ERROR", "attributes": {...}}
+# The W3C `traceparent` of the current span is sent to the server in each MCP
+# call's `_meta` and as a header on the SSE connection.
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    def __init__(self, name: str, trace_id: str, parent_span_id: str | None, attributes: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.attributes = attributes
+        self.status = "OK"
+        self.start_ns = time.time_ns()
+        self._start = time.perf_counter()
+        self.duration = 0.0
+
+    def set_attribute(self, key: str, value):
+        self.attributes[key] = value
+
+    def set_error(self, message: str):
+        self.status = "ERROR"
+        self.attributes["error"] = message
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> dict:
+        return {
+            "service": TRACE_SERVICE_NAME,
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "start_time_unix_nano": self.start_ns,
+            "end_time_unix_nano": self.start_ns + int(self.duration * 1e9),
+            "duration_ms": round(self.duration * 1000, 3),
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class _NoopSpan:
+    traceparent = None
+
+    def set_attribute(self, key: str, value):
+        pass
+
+    def set_error(self, message: str):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class JsonLinesExporter:
+    def __init__(self, path: str = TRACE_FILE):
+        self.file = open(path, "a", buffering=1, encoding="utf-8")
+
+    def export(self, span: Span):
+        self.file.write(json.dumps(span.to_dict(), default=str) + "\n")
+
+
+class ConsoleExporter:
+    def export(self, span: Span):
+        print(json.dumps(span.to_dict(), default=str))
+
+
+class Tracer:
+    """Times the stages of a turn as nested spans.
+
+    With no exporter every span is a shared no-op object, so instrumented
+    code costs one attribute lookup per stage. The current span is tracked
+    in a contextvar, so tasks started inside a span (e.g. concurrent tool
+    calls) become its children.
+    """
+
+    def __init__(self, exporter=None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        if self.exporter is None:
+            yield NOOP_SPAN
+            return
+        parent = _current_span.get()
+        span = Span(name, parent.trace_id if parent else secrets.token_hex(16),
+                    parent.span_id if parent else None, attributes)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            span.duration = time.perf_counter() - span._start
+            try:
+                _current_span.reset(token)
+            except ValueError:
+                # Finished from another context (e.g. an async generator closed elsewhere)
+                _current_span.set(parent)
+            self.exporter.export(span)
+
+    def current_traceparent(self) -> str | None:
+        span = _current_span.get()
+        return span.traceparent if span is not None else None
+
+    def headers(self) -> dict:
+        traceparent = self.current_traceparent()
+        return {"traceparent": traceparent} if traceparent else {}
+
+
+def _exporter_from_env():
+    if TRACE_EXPORTER == "file":
+        return JsonLinesExporter(TRACE_FILE)
+    if TRACE_EXPORTER == "console":
+        return ConsoleExporter()
+    return None
+
+
+tracer = Tracer(_exporter_from_env())
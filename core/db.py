@@ -1,15 +1,65 @@
-from pymongo import MongoClient
+import inspect
 import os
+
+from pymongo import AsyncMongoClient
 from dotenv import load_dotenv
 
+from signup_login.core.metrics import MongoCommandMetrics
+
 load_dotenv()
 mongo_uri = os.environ.get("MONGO_DB_URL")
-try:
-    client = MongoClient(mongo_uri)
-except Exception as e:
-    print(f"Error connecting to MongoDB: {e}")
-    sys.exit(1)
-db = client["mcp-server"]
-
-user_collection = db["users"]
-project_collection = db["projects"]
+MONGO_DB_NAME = os.environ.get("MONGO_DB_NAME", "mcp-server")
+MONGO_MAX_POOL_SIZE = int(os.environ.get("MONGO_MAX_POOL_SIZE", "100"))
+MONGO_MIN_POOL_SIZE = int(os.environ.get("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.environ.get("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.environ.get("MONGO_SOCKET_TIMEOUT_MS", "10000"))
+
+
+class MongoDatabase:
+    """Owns the async Mongo client for the lifetime of the app.
+
+    The client is created in `connect()` (called from the FastAPI lifespan)
+    rather than at import time. Pass `client` to use a stand-in such as
+    `mongomock_motor.AsyncMongoMockClient`; a `mongomock://` URL does the same.
+    """
+
+    def __init__(self, uri: str | None = mongo_uri, name: str = MONGO_DB_NAME):
+        self.uri = uri
+        self.name = name
+        self.client = None
+        self.db = None
+
+    async def connect(self, client=None):
+        if client is None:
+            if self.uri and self.uri.startswith("mongomock://"):
+                from mongomock_motor import AsyncMongoMockClient
+                client = AsyncMongoMockClient()
+            else:
+                client = AsyncMongoClient(
+                    self.uri,
+                    maxPoolSize=MONGO_MAX_POOL_SIZE,
+                    minPoolSize=MONGO_MIN_POOL_SIZE,
+                    serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                    connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+                    socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+                    event_listeners=[MongoCommandMetrics()],
+                )
+        self.client = client
+        self.db = client[self.name]
+
+    async def close(self):
+        if self.client is not None:
+            result = self.client.close()
+            if inspect.isawaitable(result):
+                await result
+        self.client = None
+        self.db = None
+
+    def collection(self, name: str):
+        if self.db is None:
+            raise RuntimeError("Database is not connected.")
+        return self.db[name]
+
+
+mongo = MongoDatabase()
@@ -0,0 +1,40 @@
+from pymongo import ASCENDING
+from pymongo.errors import PyMongoError
+
+from signup_login.core.db import MongoDatabase, mongo
+
+# collection -> list of (keys, options)
+INDEXES = {
+    "users": [
+        ([("email", ASCENDING)], {"name": "email_unique", "unique": True}),
+    ],
+    "projects": [
+        # Also serves queries that filter on user_email alone (index prefix).
+        # _id matches the (project_name, _id) page order, so paging never sorts in memory
+        ([("user_email", ASCENDING), ("project_name", ASCENDING), ("_id", ASCENDING)],
+         {"name": "user_email_project_name_id"}),
+    ],
+}
+
+
+async def ensure_indexes(database: MongoDatabase = mongo) -> dict:
+    """Create the indexes the app relies on and report how each one went.
+
+    Failures (e.g. existing duplicate emails blocking the unique index) are
+    reported rather than raised, so the server still starts.
+
+    Returns:
+        dict: {"users.email_unique": "ready" | "failed: <reason>", ...}
+    """
+    status = {}
+    for collection_name, indexes in INDEXES.items():
+        collection = database.collection(collection_name)
+        for keys, options in indexes:
+            label = f"{collection_name}.{options['name']}"
+            try:
+                await collection.create_index(keys, **options)
+                status[label] = "ready"
+            except PyMongoError as e:
+                status[label] = f"failed: {e}"
+            print(f"Index {label}: {status[label]}")
+    return status
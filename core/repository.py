@@ -0,0 +1,115 @@
+import base64
+import json
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING
+
+from signup_login.core.db import MongoDatabase, mongo
+
+# Project names aren't unique per user, so _id breaks ties and the cursor carries both
+PROJECT_SORT = [("project_name", ASCENDING), ("_id", ASCENDING)]
+
+
+def _keyset(query: dict, key: str, after: str | None) -> dict:
+    """Restrict `query` to documents sorted after the `after` cursor."""
+    if after is None:
+        return query
+    return {**query, key: {"$gt": after}}
+
+
+def encode_project_cursor(doc: dict) -> str:
+    """Opaque `after` cursor pointing just past `doc` in PROJECT_SORT order."""
+    raw = json.dumps([doc["project_name"], str(doc["_id"])], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+
+def _project_keyset(query: dict, after: str | None) -> dict:
+    """Restrict `query` to projects sorted after an encode_project_cursor cursor.
+
+    Raises:
+        ValueError: if `after` isn't a cursor this module produced.
+    """
+    if after is None:
+        return query
+    try:
+        name, object_id = json.loads(base64.urlsafe_b64decode(after.encode("ascii")))
+        object_id = ObjectId(object_id)
+    except (ValueError, TypeError, InvalidId) as e:
+        raise ValueError(f"Invalid cursor: {after}") from e
+    return {**query, "$or": [{"project_name": {"$gt": name}},
+                             {"project_name": name, "_id": {"$gt": object_id}}]}
+
+
+def _with_id(projection: dict | None) -> dict | None:
+    # The cursor needs _id even when the caller's projection leaves it out
+    return {**projection, "_id": 1} if projection else projection
+
+
+class UserRepository:
+    def __init__(self, database: MongoDatabase = mongo):
+        self.database = database
+
+    @property
+    def collection(self):
+        return self.database.collection("users")
+
+    async def get_by_email(self, email: str, projection: dict | None = None):
+        return await self.collection.find_one({"email": email}, projection)
+
+    async def create(self, name: str, email: str, hashed_password: str):
+        await self.collection.insert_one({"name": name, "email": email, "password": hashed_password})
+
+    async def delete_all(self):
+        await self.collection.delete_many({})
+
+    async def list_page(self, limit: int, after: str | None = None, projection: dict | None = None) -> list:
+        cursor = self.collection.find(_keyset({}, "email", after), projection).sort("email", ASCENDING).limit(limit)
+        return await cursor.to_list(length=limit)
+
+    async def iter_all(self, after: str | None = None, projection: dict | None = None, batch_size: int = 100):
+        cursor = self.collection.find(_keyset({}, "email", after), projection).sort("email", ASCENDING)
+        async for doc in cursor.batch_size(batch_size):
+            yield doc
+
+
+class ProjectRepository:
+    def __init__(self, database: MongoDatabase = mongo):
+        self.database = database
+
+    @property
+    def collection(self):
+        return self.database.collection("projects")
+
+    async def create(self, project: dict):
+        await self.collection.insert_one(dict(project))
+
+    async def list_page(self, user_email: str, limit: int, after: str | None = None,
+                        projection: dict | None = None) -> tuple[list, str | None]:
+        """One page of the user's projects and the cursor for the next one (None on the last page).
+
+        Returned documents never include _id.
+        """
+        query = _project_keyset({"user_email": user_email}, after)
+        cursor = self.collection.find(query, _with_id(projection)).sort(PROJECT_SORT).limit(limit)
+        projects = await cursor.to_list(length=limit)
+        next_after = encode_project_cursor(projects[-1]) if len(projects) == limit else None
+        for project in projects:
+            project.pop("_id", None)
+        return projects, next_after
+
+    def iter_for_user(self, user_email: str, after: str | None = None, projection: dict | None = None,
+                      batch_size: int = 100):
+        # Not a generator itself, so an invalid cursor raises here rather than mid-stream
+        query = _project_keyset({"user_email": user_email}, after)
+        return self._iter(query, projection, batch_size)
+
+    async def _iter(self, query: dict, projection: dict | None, batch_size: int):
+        cursor = self.collection.find(query, projection).sort(PROJECT_SORT)
+        async for doc in cursor.batch_size(batch_size):
+            doc.pop("_id", None)
+            yield doc
+
+
+user_repository = UserRepository()
+project_repository = ProjectRepository()
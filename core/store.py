@@ -0,0 +1,114 @@
+import json
+import os
+
+from dotenv import load_dotenv
+
+from signup_login.auth.cache import TTLCache
+
+load_dotenv()
+# "memory://" keeps entries in this process; "redis://host:6379/0" shares them
+# between uvicorn workers; "fakeredis://" is an in-process Redis stand-in (dev extra)
+STORE_URL = os.environ.get("STORE_URL", "memory://")
+STORE_TTL_SECONDS = int(os.environ.get("STORE_TTL_SECONDS", "900"))
+STORE_MAX_ENTRIES = int(os.environ.get("STORE_MAX_ENTRIES", "10000"))
+DEFAULT_SCOPE = "default"
+
+
+class MemoryBackend:
+    """Per-process backend; bounded to `maxsize` entries, least recently used evicted first."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.cache = TTLCache(maxsize, ttl)
+
+    async def get(self, key: str):
+        return self.cache.get(key)
+
+    async def set(self, key: str, value: dict, ttl: float):
+        self.cache.set(key, value, ttl)
+
+    async def delete(self, key: str):
+        self.cache.invalidate(key)
+
+    async def close(self):
+        self.cache.clear()
+
+    def stats(self) -> dict:
+        return {"backend": "memory", **self.cache.stats()}
+
+
+class RedisBackend:
+    """Shared backend over a `redis.asyncio`-compatible client; Redis expires the keys."""
+
+    def __init__(self, client):
+        self.client = client
+
+    async def get(self, key: str):
+        raw = await self.client.get(key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, value: dict, ttl: float):
+        await self.client.set(key, json.dumps(value), ex=max(1, int(ttl)))
+
+    async def delete(self, key: str):
+        await self.client.delete(key)
+
+    async def close(self):
+        await self.client.aclose()
+
+    def stats(self) -> dict:
+        return {"backend": "redis"}
+
+
+class ScopedStore:
+    """Small keyed store for per-session state such as the last pushed credentials.
+
+    Values are dicts addressed by `(scope, name)`, where the scope is
+    normally the caller's session id, and expire after `ttl` seconds. The
+    backend is picked from the URL in `connect()` (called from the FastAPI
+    lifespan); pass `backend` to use another one.
+    """
+
+    def __init__(self, url: str = STORE_URL, ttl: float = STORE_TTL_SECONDS, maxsize: int = STORE_MAX_ENTRIES,
+                 prefix: str = "mcp-store"):
+        self.url = url
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.prefix = prefix
+        self.backend = None
+
+    async def connect(self, backend=None):
+        if backend is None:
+            if self.url.startswith("fakeredis://"):
+                from fakeredis import FakeAsyncRedis
+                backend = RedisBackend(FakeAsyncRedis())
+            elif self.url.startswith(("redis://", "rediss://", "unix://")):
+                from redis.asyncio import from_url
+                backend = RedisBackend(from_url(self.url))
+            else:
+                backend = MemoryBackend(self.maxsize, self.ttl)
+        self.backend = backend
+
+    async def close(self):
+        if self.backend is not None:
+            await self.backend.close()
+        self.backend = None
+
+    def _key(self, scope: str, name: str) -> str:
+        if self.backend is None:
+            raise RuntimeError("Store is not connected.")
+        return f"{self.prefix}:{scope}:{name}"
+
+    async def get(self, scope: str, name: str) -> dict | None:
+        return await self.backend.get(self._key(scope, name))
+
+    async def set(self, scope: str, name: str, value: dict):
+        await self.backend.set(self._key(scope, name), value, self.ttl)
+
+    async def delete(self, scope: str, name: str):
+        await self.backend.delete(self._key(scope, name))
+
+    def stats(self) -> dict:
+        return self.backend.stats() if self.backend is not None else {}
+
+
+store = ScopedStore()
@@ -0,0 +1,74 @@
+import json
+import os
+import secrets
+import time
+
+from dotenv import load_dotenv
+from fastapi_mcp import FastApiMCP
+
+load_dotenv()
+# JSON-lines span log for MCP tool executions; unset disables tracing
+SERVER_TRACE_FILE = os.environ.get("SERVER_TRACE_FILE")
+
+
+def _parse_traceparent(value: str | None) -> tuple[str | None, str | None]:
+    """Split a W3C traceparent ("00-<trace_id>-<span_id>-<flags>") into its ids."""
+    parts = (value or "").split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None, None
+    return parts[1], parts[2]
+
+
+class TracedFastApiMCP(FastApiMCP):
+    """FastApiMCP that logs one span per tool execution.
+
+    The span continues the client's trace: the traceparent comes from the
+    MCP request's `_meta`, falling back to the header on the client's SSE
+    connection. Spans use the same JSON-lines shape as client/tracing.py,
+    so both logs can be joined on trace_id.
+    """
+
+    def __init__(self, *args, trace_file: str | None = SERVER_TRACE_FILE, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._trace_log = open(trace_file, "a", buffering=1, encoding="utf-8") if trace_file else None
+
+    def _incoming_traceparent(self, http_request_info) -> str | None:
+        try:
+            meta = self.server.request_context.meta
+            traceparent = (getattr(meta, "model_extra", None) or {}).get("traceparent") if meta else None
+        except (LookupError, AttributeError):
+            traceparent = None
+        if not traceparent and http_request_info is not None and http_request_info.headers:
+            traceparent = http_request_info.headers.get("traceparent")
+        return traceparent
+
+    async def _execute_api_tool(self, *args, **kwargs):
+        if self._trace_log is None:
+            return await super()._execute_api_tool(*args, **kwargs)
+
+        tool_name = kwargs.get("tool_name", args[1] if len(args) > 1 else None)
+        trace_id, parent_span_id = _parse_traceparent(self._incoming_traceparent(kwargs.get("http_request_info")))
+        start_ns = time.time_ns()
+        start = time.perf_counter()
+        status = "OK"
+        attributes = {"tool": tool_name}
+        try:
+            return await super()._execute_api_tool(*args, **kwargs)
+        except Exception as e:
+            status = "ERROR"
+            attributes["error"] = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            self._trace_log.write(json.dumps({
+                "service": "mcp-server",
+                "name": "mcp.tool",
+                "trace_id": trace_id or secrets.token_hex(16),
+                "span_id": secrets.token_hex(8),
+                "parent_span_id": parent_span_id,
+                "start_time_unix_nano": start_ns,
+                "end_time_unix_nano": start_ns + int(duration * 1e9),
+                "duration_ms": round(duration * 1000, 3),
+                "status": status,
+                "attributes": attributes,
+            }) + "\n")
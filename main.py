@@ -1,27 +1,91 @@
-from fastapi import FastAPI, HTTPException, WebSocket, Depends, status
+from fastapi import FastAPI, HTTPException, WebSocket, Depends, Query, Request, status
 from typing import Annotated
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, Response, StreamingResponse
 from fastapi.security import OAuth2PasswordBearer
-from fastapi_mcp import FastApiMCP
 from signup_login.models import user
-from signup_login.core.db import user_collection, project_collection
+from signup_login.core.db import mongo
+from signup_login.core.repository import user_repository, project_repository
+from signup_login.core.indexes import ensure_indexes
+from signup_login.core.store import store, DEFAULT_SCOPE
+from signup_login.core.metrics import MetricsMiddleware, render_metrics
+from signup_login.core.tracing import TracedFastApiMCP
+from pymongo.errors import DuplicateKeyError
+from signup_login.core.broker import tool_args_hub, tool_args_consumer, chat_stream_hub, chat_stream_consumer
 # from client.client_gemini import run_mcp, MCPClient
 import asyncio
 from contextlib import asynccontextmanager
 from typing import Dict
-import pika
 import bcrypt
 import os
-from signup_login.auth.auth import oauth2_scheme, verify_password, password_hash, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES, get_current_user, authenticate_user
+from signup_login.auth.auth import oauth2_scheme, password_hash_async, create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES, get_current_user, authenticate_user, invalidate_user_cache, auth_cache_stats, token_subject, auth_invalidation_consumer
+from signup_login.auth.hashing import password_hasher
 from datetime import timedelta
+import json
 
 
 
-_last_login_creds: Dict[str, str] = {}
-_last_signup_creds: Dict[str, str] = {}
-_project_info: Dict[str, str] = {}
+MAX_PAGE_SIZE = 100
+USER_FIELDS = {"name", "email"}
+PROJECT_FIELDS = {"project_name", "project_description", "user_email"}
 
-app = FastAPI()
+_index_status: Dict[str, str] = {}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await mongo.connect()
+    await store.connect()
+    _index_status.update(await ensure_indexes())
+    # Connects in the background and keeps retrying while RabbitMQ is down
+    await tool_args_consumer.start()
+    await chat_stream_consumer.start()
+    await auth_invalidation_consumer.start()
+    yield
+    await tool_args_consumer.stop()
+    await chat_stream_consumer.stop()
+    await auth_invalidation_consumer.stop()
+    await mongo.close()
+    await store.close()
+    password_hasher.shutdown()
+
+app = FastAPI(lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
+
+
+def _projection(fields: str | None, allowed: set, cursor_field: str) -> dict:
+    """Build a Mongo projection from a comma-separated `fields` parameter."""
+    requested = {f.strip() for f in fields.split(",") if f.strip()} if fields else set(allowed)
+    unknown = requested - allowed
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    # The cursor field is always returned so the caller can ask for the next page
+    projection = {field: 1 for field in requested | {cursor_field}}
+    projection["_id"] = 0
+    return projection
+
+def _user_scope(email: str) -> str:
+    return f"user:{email}"
+
+def _scope(request: Request) -> str:
+    """Store scope for the caller.
+
+    A valid bearer token scopes to its user; that is what reaches the routes
+    behind MCP tools, since fastapi-mcp forwards only the Authorization
+    header. Otherwise the X-Session-ID header the clients send, and without
+    either the shared default.
+    """
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() == "bearer" and token:
+        email = token_subject(token)
+        if email:
+            return _user_scope(email)
+    session_id = request.headers.get("x-session-id")
+    return f"session:{session_id}" if session_id else DEFAULT_SCOPE
+
+def _ndjson(docs):
+    async def lines():
+        async for doc in docs:
+            yield json.dumps(doc) + "\n"
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
 
 
 @app.post("/signup", status_code = status.HTTP_201_CREATED, operation_id="signup")
@@ -29,11 +93,17 @@ async def signup(name: str, email: str, password: str, re_password: str):
     if password != re_password:
         raise HTTPException(status_code=400, detail="Passwords do not match")
 
-    existing_user = user_collection.find_one({"email": email})
+    existing_user = await user_repository.get_by_email(email)
     if existing_user:
         raise HTTPException(status_code=400, detail="User with this email already exists")
 
-    user_collection.insert_one({"name": name, "email": email, "password": password_hash(password)})
+    hashed_password = await password_hash_async(password)
+    try:
+        await user_repository.create(name, email, hashed_password)
+    except DuplicateKeyError:
+        # Lost a race with a concurrent signup for the same email
+        raise HTTPException(status_code=400, detail="User with this email already exists")
+    await invalidate_user_cache(email)
     return {"message": "User signed up successfully"}
 
 # @app.post("/login", operation_id="login")
@@ -45,7 +115,7 @@ async def signup(name: str, email: str, password: str, re_password: str):
 
 @app.post("/token", operation_id="login")
 async def login_for_access_token(email: str, password: str):
-    user_data = authenticate_user(email, password)
+    user_data = await authenticate_user(email, password)
     if not user_data:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -64,59 +134,139 @@ async def read_users_me(current_user: Annotated[dict, Depends(get_current_user)]
 
 @app.get("/clear_users", operation_id="clear_users")
 async def clear_users():
-    user_collection.delete_many({})
+    await user_repository.delete_all()
+    await invalidate_user_cache()
     return {"message": "Users cleared successfully"}
 
 @app.get("/users", operation_id="get_users")
-async def get_users():
-    users = list(user_collection.find({}, {"_id": 0}))
-    return users
+async def get_users(
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = 20,
+    after: str | None = None,
+    fields: str | None = None,
+):
+    """List users ordered by email, `limit` at a time.
+
+    Pass the returned `next_after` as `after` to get the next page. `fields` is
+    a comma-separated subset of name,email.
+    """
+    projection = _projection(fields, USER_FIELDS, "email")
+    users = await user_repository.list_page(limit, after, projection)
+    next_after = users[-1]["email"] if len(users) == limit else None
+    return {"users": users, "next_after": next_after}
 
 @app.post("/create-project", operation_id="create_project")
 async def create_project(project: user.Project, current_user: Annotated[dict, Depends(get_current_user)]):
-    global _project_info
-    _project_info = project.model_dump()
-    _project_info["user_email"] = current_user["email"]
-    project_collection.insert_one(project.model_dump())
+    project_info = project.model_dump()
+    project_info["user_email"] = current_user["email"]
+    await project_repository.create(project_info)
+    await store.set(_user_scope(current_user["email"]), "project_info", project_info)
     return {"message": "Project created successfully"}
 
+@app.get("/projects", operation_id="list_projects")
+async def list_projects(
+    current_user: Annotated[dict, Depends(get_current_user)],
+    limit: Annotated[int, Query(ge=1, le=MAX_PAGE_SIZE)] = 20,
+    after: str | None = None,
+    fields: str | None = None,
+):
+    """List the current user's projects ordered by name; paginated like /users (`next_after` is opaque)."""
+    projection = _projection(fields, PROJECT_FIELDS, "project_name")
+    try:
+        projects, next_after = await project_repository.list_page(current_user["email"], limit, after, projection)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"projects": projects, "next_after": next_after}
+
 
 
-mcp = FastApiMCP(app)
+mcp = TracedFastApiMCP(app)
 mcp.mount()
 
+# Bulk exports are registered after mount so they aren't exposed as MCP tools
+
+@app.get("/users/export")
+async def export_users(
+    after: str | None = None,
+    fields: str | None = None,
+    batch_size: Annotated[int, Query(ge=1, le=1000)] = MAX_PAGE_SIZE,
+):
+    """Stream every user after `after` as NDJSON (one JSON object per line), ordered by email."""
+    projection = _projection(fields, USER_FIELDS, "email")
+    return _ndjson(user_repository.iter_all(after, projection, batch_size=batch_size))
+
+@app.get("/projects/export")
+async def export_projects(
+    current_user: Annotated[dict, Depends(get_current_user)],
+    after: str | None = None,
+    fields: str | None = None,
+    batch_size: Annotated[int, Query(ge=1, le=1000)] = MAX_PAGE_SIZE,
+):
+    """Stream the current user's projects as NDJSON; `after` is a /projects `next_after` cursor."""
+    projection = _projection(fields, PROJECT_FIELDS, "project_name")
+    try:
+        docs = project_repository.iter_for_user(current_user["email"], after, projection, batch_size=batch_size)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return _ndjson(docs)
+
+# Dropped from pushed credentials; the GET endpoints below are unauthenticated
+SECRET_FIELDS = {"password", "re_password", "access_token"}
+
+def _without_secrets(creds: dict) -> dict:
+    return {key: value for key, value in creds.items() if key not in SECRET_FIELDS}
+
 @app.post("/creds_signup")
-async def put_signup_creds(creds: dict):
-    required_fields = ["name", "email", "password", "re_password"]
+async def put_signup_creds(request: Request, creds: dict):
+    required_fields = ["name", "email"]
     if not all(field in creds for field in required_fields):
         raise HTTPException(status_code=400, detail="Missing required fields")
-    if creds["password"] != creds["re_password"]:
-        raise HTTPException(status_code=400, detail="Passwords do not match")
 
-    global _last_signup_creds
-    _last_signup_creds = creds
+    await store.set(_scope(request), "signup_creds", _without_secrets(creds))
     return {"message": "Signup credentials pushed successfully"}
 
 @app.post("/creds_login")
-async def put_login_creds(creds: dict):
-    required_fields = ["email", "password"]
+async def put_login_creds(request: Request, creds: dict):
+    required_fields = ["email"]
     if not all(field in creds for field in required_fields):
         raise HTTPException(status_code=400, detail="Missing required fields")
-    global _last_login_creds
-    _last_login_creds = creds
+    await store.set(_scope(request), "login_creds", _without_secrets(creds))
     return {"message": "Credentials pushed successfully"}
 
 @app.get("/creds_signup")
-async def get_signup_creds():
-    return _last_signup_creds or {}
+async def get_signup_creds(request: Request):
+    return await store.get(_scope(request), "signup_creds") or {}
 
 @app.get("/creds_login")
-async def get_login_creds():
-    return _last_login_creds or {}
+async def get_login_creds(request: Request):
+    return await store.get(_scope(request), "login_creds") or {}
 
 @app.get("/creds_project")
-async def get_project_info():
-    return _project_info or {}
+async def get_project_info(request: Request):
+    return await store.get(_scope(request), "project_info") or {}
+
+@app.get("/db/index-status")
+async def get_index_status():
+    return _index_status
+
+@app.get("/auth/cache-stats")
+async def get_auth_cache_stats():
+    return auth_cache_stats()
+
+@app.get("/healthz")
+async def healthz():
+    """Readiness probe; reports the worker pid so load balancing across workers is visible."""
+    if mongo.db is None:
+        raise HTTPException(status_code=503, detail="Database is not connected")
+    return {"status": "ok", "pid": os.getpid()}
+
+@app.get("/metrics")
+async def metrics():
+    body, content_type = render_metrics()
+    return Response(body, media_type=content_type)
+
+@app.get("/store/stats")
+async def get_store_stats():
+    return store.stats()
 
 html = """
 <!DOCTYPE html>
@@ -158,20 +308,13 @@ async def get(token: Annotated[str, Depends(oauth2_scheme)]):
 @app.websocket("/ws/tool_args")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
-    while True:
-        data = await websocket.receive_text()
-        connection = pika.BlockingConnection(pika.ConnectionParameters("localhost"))
-        channel = connection.channel()
-        messages = []
-        
-        def callback(ch, method, properties, body):
-            messages.append(body)
-            print(" [x] Received %r" % body)
-        print(messages)
-        channel.queue_declare(queue="tool_args")
-        channel.basic_consume(queue="tool_args", on_message_callback=callback, auto_ack=True)
-        channel.start_consuming()
-        await websocket.send_text(messages[-1].decode("utf-8"))
+    await tool_args_hub.serve(websocket)
+
+@app.websocket("/ws/chat_stream")
+async def chat_stream_endpoint(websocket: WebSocket):
+    """Relays the clients' streamed response deltas and tool events as they happen."""
+    await websocket.accept()
+    await chat_stream_hub.serve(websocket)
 
 if __name__ == "__main__":
     import uvicorn
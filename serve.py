@@ -0,0 +1,53 @@
+"""Production entry point: the FastAPI MCP server on N uvicorn worker processes.
+
+Every worker imports the app on its own and opens its Mongo, RabbitMQ and
+store connections in the lifespan, so nothing is shared across the fork.
+On SIGTERM/SIGINT the workers stop accepting connections, let in-flight
+requests finish for up to SERVER_GRACEFUL_TIMEOUT_SECONDS, then run the
+lifespan shutdown.
+
+    python -m signup_login.serve --workers 4 --port 8000
+"""
+import argparse
+import os
+
+import uvicorn
+from dotenv import load_dotenv
+
+load_dotenv()
+SERVER_HOST = os.environ.get("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.environ.get("SERVER_PORT", "8000"))
+SERVER_WORKERS = int(os.environ.get("SERVER_WORKERS", str(os.cpu_count() or 1)))
+SERVER_GRACEFUL_TIMEOUT_SECONDS = int(os.environ.get("SERVER_GRACEFUL_TIMEOUT_SECONDS", "30"))
+SERVER_KEEPALIVE_SECONDS = int(os.environ.get("SERVER_KEEPALIVE_SECONDS", "5"))
+SERVER_BACKLOG = int(os.environ.get("SERVER_BACKLOG", "2048"))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS)
+    parser.add_argument("--graceful-timeout", type=int, default=SERVER_GRACEFUL_TIMEOUT_SECONDS)
+    args = parser.parse_args()
+
+    store_url = os.environ.get("STORE_URL", "memory://")
+    if args.workers > 1 and store_url.startswith("memory://"):
+        print("Warning: STORE_URL is memory://, so /creds_* state is per worker; use a redis:// URL to share it")
+    if args.workers > 1 and os.environ.get("MONGO_DB_URL", "").startswith("mongomock://"):
+        print("Warning: mongomock:// gives every worker its own empty database")
+
+    uvicorn.run(
+        "signup_login.main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        timeout_keep_alive=SERVER_KEEPALIVE_SECONDS,
+        backlog=SERVER_BACKLOG,
+        lifespan="on",
+    )
+
+
+if __name__ == "__main__":
+    main()
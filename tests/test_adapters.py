@@ -0,0 +1,116 @@
+"""The engine's tool loop gives the same transcript through every provider adapter.
+
+Each client runs scripted fake-provider scenarios against a stub MCP session;
+the tool calls the model made, the tool results sent back and the final
+answer must come out the same whichever provider API carried them.
+"""
+import asyncio
+import importlib
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+from fake_provider import (ANSWER, FakeProvider, Scenario, StubMCPSession, attach_stub_session,  # noqa: E402
+                           server_tools, start_fake_provider, use_fake_provider)
+
+PORT = 8940
+CLIENTS = ["client_openai", "client_anthropic", "client_gemini"]
+SCENARIOS = ["text", "single_tool", "multi_call", "chain"]
+
+# Before any client module (and its SDK client) is imported
+use_fake_provider(PORT)
+os.environ["TOOL_ARGS_RELAY"] = "0"
+os.environ["STREAM_RELAY"] = "0"
+
+
+def _run_turn(client_module: str, scenario: Scenario, query: str, tool_hooks: dict | None = None) -> tuple:
+    async def turn():
+        from http_pool import close_shared_http_client
+
+        provider = FakeProvider(scenario=scenario)
+        session = StubMCPSession(server_tools())
+        client = attach_stub_session(importlib.import_module(client_module).MCPClient(), session)
+        if tool_hooks is not None:
+            client.tool_hooks = tool_hooks
+        runner = await start_fake_provider(provider, port=PORT)
+        try:
+            text, messages = await client.process_query(query)
+        finally:
+            await runner.cleanup()
+            await client.adapter.aclose()
+            # The shared pool belongs to this event loop; the next test gets a new one
+            await close_shared_http_client()
+        return text, messages, provider, session
+
+    return asyncio.run(turn())
+
+
+def _expected_transcript(scenario: Scenario, query: str) -> list:
+    """(role, payload) pairs the engine should build for one turn of `scenario`."""
+    transcript = [("user", query)]
+    for step in scenario.steps:
+        calls = step.get("tool_calls")
+        if not calls:
+            transcript.append(("assistant", step["text"]))
+            break
+        transcript.append(("assistant", [(call["name"], call["args"]) for call in calls]))
+        transcript += [("tool", (call["name"], json.dumps({"tool": call["name"], "args": call["args"]})))
+                       for call in calls]
+    return transcript
+
+
+def _actual_transcript(messages: list) -> list:
+    transcript = []
+    for message in messages:
+        if message["role"] == "assistant" and message.get("tool_calls"):
+            transcript.append(("assistant", [(call["name"], call["args"]) for call in message["tool_calls"]]))
+        elif message["role"] == "tool":
+            transcript.append(("tool", (message["name"], message["content"])))
+        else:
+            transcript.append((message["role"], message["content"]))
+    return transcript
+
+
+@pytest.mark.parametrize("scenario_name", SCENARIOS)
+@pytest.mark.parametrize("client_module", CLIENTS)
+def test_tool_loop_transcript(client_module, scenario_name):
+    scenario = Scenario.load(scenario_name)
+    query = f"Run the {scenario_name} scenario"
+    text, messages, provider, session = _run_turn(client_module, scenario, query)
+
+    assert _actual_transcript(messages) == _expected_transcript(scenario, query)
+    assert text == scenario.steps[-1]["text"]
+    assert provider.requests == scenario.model_calls()
+    assert session.calls == scenario.tool_calls()
+
+
+@pytest.mark.parametrize("client_module", CLIENTS)
+def test_tool_results_answer_their_calls(client_module):
+    _, messages, _, _ = _run_turn(client_module, Scenario.load("chain"), "Run the chain scenario")
+
+    pending = []
+    for message in messages:
+        if message["role"] == "assistant":
+            assert not pending, "a tool call was left without a result"
+            pending = [call["id"] for call in message.get("tool_calls", [])]
+        elif message["role"] == "tool":
+            assert message["tool_call_id"] == pending.pop(0)
+            assert not message["is_error"]
+    assert not pending
+    assert messages[-1] == {"role": "assistant", "content": ANSWER}
+
+
+@pytest.mark.parametrize("client_module", CLIENTS)
+def test_failing_hook_leaves_the_transcript_whole(client_module):
+    def hook(args):
+        raise RuntimeError("hook failed")
+
+    scenario = Scenario.load("single_tool")
+    text, messages, _, _ = _run_turn(client_module, scenario, "Who am I?", {"get_current_user": hook})
+
+    assert _actual_transcript(messages) == _expected_transcript(scenario, "Who am I?")
+    assert text == ANSWER
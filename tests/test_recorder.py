@@ -0,0 +1,21 @@
+"""Session recordings never contain credentials."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "client"))
+from recorder import REDACTED, TurnRecord  # noqa: E402
+
+
+def test_tool_args_are_redacted():
+    args = {"name": "Ada", "email": "ada@example.com", "password": "hunter2", "re_password": "hunter2",
+            "nested": {"Authorization": "Bearer abc", "items": [{"access_token": "xyz", "limit": 5}]}}
+    record = TurnRecord("chat-1", "sign me up", "openai", "fake")
+    record.llm_start()
+    record.llm_done()
+    record.tool_done("signup", args, elapsed=0.01, is_error=False)
+
+    recorded = record.to_dict()["steps"][0]["tool_calls"][0]["args"]
+    assert recorded == {"name": "Ada", "email": "ada@example.com", "password": REDACTED, "re_password": REDACTED,
+                        "nested": {"Authorization": REDACTED, "items": [{"access_token": REDACTED, "limit": 5}]}}
+    # The caller's arguments (still needed for the real tool call) are untouched
+    assert args["password"] == "hunter2"
@@ -0,0 +1,49 @@
+"""A question asked again in the same chat is answered from the response cache."""
+import asyncio
+import builtins
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+from fake_provider import (FakeProvider, Scenario, StubMCPSession, attach_stub_session,  # noqa: E402
+                           server_tools, start_fake_provider, use_fake_provider)
+
+# Same port as test_adapters: the SDK clients are built once per process
+PORT = 8940
+
+use_fake_provider(PORT)
+os.environ["TOOL_ARGS_RELAY"] = "0"
+os.environ["STREAM_RELAY"] = "0"
+
+
+def test_repeated_question_in_chat_loop_is_cached(monkeypatch, capsys):
+    from client_openai import MCPClient
+    from http_pool import close_shared_http_client
+    from response_cache import ResponseCache
+
+    queries = iter(["Who am I?", "Who am I?", "who am I ", "quit"])
+    monkeypatch.setattr(builtins, "input", lambda prompt="": next(queries))
+    scenario = Scenario.load("single_tool")
+
+    async def chat():
+        provider = FakeProvider(scenario=scenario)
+        session = StubMCPSession(server_tools())
+        client = attach_stub_session(MCPClient(), session)
+        client.response_cache = ResponseCache()
+        runner = await start_fake_provider(provider, port=PORT)
+        try:
+            await client.chat_loop()
+        finally:
+            await runner.cleanup()
+            await client.adapter.aclose()
+            await close_shared_http_client()
+        return provider, session, client.response_cache.stats()
+
+    provider, session, stats = asyncio.run(chat())
+
+    # Only the first turn reached the model and the server, however long the history grew
+    assert provider.requests == scenario.model_calls()
+    assert session.calls == scenario.tool_calls()
+    assert stats["hits"] == 2
+    assert capsys.readouterr().out.count("[Answered from the response cache]") == 2